@@ -0,0 +1,74 @@
+"""
+Loads every image the game uses once at startup and hands out the cached surfaces.
+
+Each image is converted to the display's pixel format when it is loaded (convert_alpha for images with
+per-pixel alpha, convert otherwise) and any surface alpha is applied up front, so blitting it later is
+a plain copy. Load time and memory are recorded per asset and available from report().
+
+The display mode must be set before load is called, because convert needs it.
+
+"""
+
+import time
+
+import pygame
+
+# name -> (file, surface alpha or None)
+GAME_ASSETS = {
+    "start_background": ("Sudoku Background.png", None),
+    "game_background": ("sam pixel classroom scaled.png", 60),
+}
+
+
+class AssetManager:
+    def __init__(self):
+        self.surfaces = {}
+        self.load_seconds = {}
+
+    def load(self, name, path, alpha=None):
+        """
+        Loads, converts and caches one image under name, and returns the surface.
+        """""
+        start = time.perf_counter()
+        surface = pygame.image.load(path)
+        if surface.get_flags() & pygame.SRCALPHA:
+            surface = surface.convert_alpha()
+        else:
+            surface = surface.convert()
+        if alpha is not None:
+            surface.set_alpha(alpha)
+        self.load_seconds[name] = time.perf_counter() - start
+        self.surfaces[name] = surface
+        return surface
+
+    def load_all(self, assets=GAME_ASSETS):
+        """
+        Loads every entry of a {name: (file, alpha)} mapping.
+        """""
+        for name, (path, alpha) in assets.items():
+            self.load(name, path, alpha)
+
+    def get(self, name):
+        return self.surfaces[name]
+
+    def memory(self, name):
+        """
+        Returns the number of bytes of pixel data held by an asset.
+        """""
+        surface = self.surfaces[name]
+        return surface.get_pitch() * surface.get_height()
+
+    def report(self):
+        """
+        Returns one line per asset with its size, load time and memory use.
+        """""
+        lines = []
+        for name, surface in self.surfaces.items():
+            width, height = surface.get_size()
+            lines.append(f"{name}: {width}x{height}, loaded in {self.load_seconds[name] * 1000:.1f} ms, "
+                         f"{self.memory(name) / 1024:.0f} KiB")
+        return "\n".join(lines)
+
+    def clear(self):
+        self.surfaces.clear()
+        self.load_seconds.clear()
@@ -0,0 +1,101 @@
+"""
+Batch puzzle generation for building puzzle inventories offline.
+
+generate_many spreads generate_sudoku calls across a process pool. Every puzzle gets its own seed,
+hashed from a base seed and the puzzle's index, so a run can be reproduced exactly, the result does not
+depend on how many workers were used or how the work was chunked, and batches started from different
+base seeds do not share puzzles.
+
+"""
+
+import hashlib
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from sudoku_generator import generate_sudoku
+
+
+'''
+Returns the seed used for the puzzle at index in a batch started from base_seed
+The seed is a blake2b hash of both numbers rather than base_seed + index, which would make the batches
+for neighbouring base seeds shifted copies of each other
+
+Parameters:
+base_seed is the seed passed to generate_many
+index is the position of the puzzle in the batch
+
+Return: int (an unsigned 64 bit seed)
+'''
+
+
+def puzzle_seed(base_seed, index):
+    digest = hashlib.blake2b(f"{base_seed}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+'''
+Worker entry point: generates count puzzles starting at index start
+
+Parameters:
+args is a tuple (base_seed, start, count, size, removed, unique, solutions, max_attempts)
+
+Return: list[list[list]] (the generated boards, in index order), or (board, solution) tuples with solutions
+'''
+
+
+def _generate_chunk(args):
+    base_seed, start, count, size, removed, unique, solutions, max_attempts = args
+    boards = []
+    for index in range(start, start + count):
+        boards.append(generate_sudoku(size, removed, unique=unique, seed=puzzle_seed(base_seed, index),
+                                      solution=solutions, max_attempts=max_attempts))
+    return boards
+
+
+'''
+Generates n puzzles across a process pool and streams them back in order
+Work is handed out in chunks of chunk_size puzzles and at most two chunks per worker are in flight,
+so memory stays bounded no matter how large n is.
+
+Parameters:
+n is the number of puzzles to generate
+removed is the number of cells to clear in each puzzle
+workers is the number of worker processes (default: os.cpu_count()); 1 generates in this process
+size is the number of rows/columns of each board (default 9)
+unique is passed through to generate_sudoku (default False)
+seed is the base seed for the batch (default: a random one)
+chunk_size is the number of puzzles per task sent to a worker (default 64)
+solutions is a boolean - yield (board, solution) pairs, where solution is the grid the generator
+carved the board from (default False)
+max_attempts is passed through to generate_sudoku (default None, its default budget)
+
+Return: iterator of list[list] (one board per puzzle), or of (board, solution) tuples with solutions
+'''
+
+
+def generate_many(n, removed, workers=None, size=9, unique=False, seed=None, chunk_size=64, solutions=False,
+                  max_attempts=None):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    chunks = (
+        (seed, start, min(chunk_size, n - start), size, removed, unique, solutions, max_attempts)
+        for start in range(0, n, chunk_size)
+    )
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _generate_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_generate_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
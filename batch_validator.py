@@ -0,0 +1,89 @@
+"""
+Vectorized validation of many boards at once with NumPy.
+
+validate_batch takes an (N, size, size) array of boards and checks every row, column and box of every
+board in a handful of array operations, with no Python loop over boards. The rules are the same as
+check_board in sudoku_generator.py: 0 is an empty cell and only repeated non-zero values count as
+conflicts.
+
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+BatchResult = namedtuple("BatchResult", ["valid", "solved", "row_conflicts", "col_conflicts", "box_conflicts"])
+BatchResult.__doc__ = """
+valid         - (N,) bool, True where the board has no conflicts (what check_board returns)
+solved        - (N,) bool, True where the board is valid and has no empty cells
+row_conflicts - (N, size) bool, True where that row repeats a value
+col_conflicts - (N, size) bool, True where that column repeats a value
+box_conflicts - (N, size) bool, True where that box repeats a value (boxes numbered left to right, top to bottom)
+"""
+
+
+'''
+Regroups the cells of each board so that unit b along axis 1 holds the cells of box b
+
+Parameters:
+boards is an (N, size, size) array
+
+Return: (N, size, size) array
+'''
+
+
+def boxes_of(boards):
+    count, size, _ = boards.shape
+    box = math.isqrt(size)
+    return boards.reshape(count, box, box, box, box).transpose(0, 1, 3, 2, 4).reshape(count, size, size)
+
+
+'''
+Returns, for every unit along axis 1, whether any value 1..size appears more than once
+
+Parameters:
+units is an (N, size, size) array where units[n, u] holds the cells of unit u of board n
+
+Return: (N, size) bool array
+'''
+
+
+def unit_conflicts(units):
+    size = units.shape[1]
+    # one_hot[n, u, c, v] is True when cell c of unit u holds value v + 1; empty cells match nothing
+    one_hot = units[..., None] == np.arange(1, size + 1, dtype=units.dtype)
+    return (one_hot.sum(axis=2, dtype=np.uint8) > 1).any(axis=2)
+
+
+'''
+Validates a batch of boards
+
+Parameters:
+boards is anything np.asarray accepts with shape (N, size, size), normally an (N, 9, 9) uint8 array;
+a single (size, size) board is treated as a batch of one. Values must be integers from 0 to size; they are
+checked before the conversion to uint8, so wider arrays cannot wrap into range.
+
+Return: BatchResult
+'''
+
+
+def validate_batch(boards):
+    boards = np.asarray(boards)
+    if boards.ndim == 2:
+        boards = boards[None]
+    if boards.ndim != 3 or boards.shape[1] != boards.shape[2]:
+        raise ValueError(f"expected an (N, size, size) array, got shape {boards.shape}")
+    size = boards.shape[1]
+    if math.isqrt(size) ** 2 != size:
+        raise ValueError(f"board size {size} is not a perfect square")
+    if boards.size and (boards.dtype.kind not in "iub" or boards.min() < 0 or boards.max() > size):
+        raise ValueError(f"board values must be integers between 0 and {size}")
+    boards = boards.astype(np.uint8, copy=False)
+
+    row_conflicts = unit_conflicts(boards)
+    col_conflicts = unit_conflicts(boards.transpose(0, 2, 1))
+    box_conflicts = unit_conflicts(boxes_of(boards))
+    valid = ~(row_conflicts.any(axis=1) | col_conflicts.any(axis=1) | box_conflicts.any(axis=1))
+    solved = valid & (boards != 0).all(axis=(1, 2))
+    return BatchResult(valid, solved, row_conflicts, col_conflicts, box_conflicts)
@@ -0,0 +1,242 @@
+"""
+Reproducible benchmarks for generation, solving, validation and rendering.
+
+Every benchmark uses fixed seeds, so the work done is identical from run to run; only the timings vary
+with the machine. Results are written as JSON and can be compared against a stored baseline:
+
+    python benchmark.py --save-baseline                # record benchmark_baseline.json
+    python benchmark.py                                # run and compare against it
+    python benchmark.py --quick --output results.json
+
+A timing metric counts as a regression when it is more than --tolerance (default 20%) worse than the
+baseline. Work counters such as backtracks are deterministic with fixed seeds, so any increase counts.
+The exit status is 1 if anything regressed.
+
+Rendering is measured with SDL's dummy video driver, so no window is opened.
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from dlx_solver import solve
+from metrics import Metrics
+from sudoku_generator import (DIFFICULTY_REMOVED, InstrumentedSudokuGenerator, SudokuGenerator, check_board,
+                              generate_sudoku)
+
+BASELINE = "benchmark_baseline.json"
+
+# metric name suffixes where bigger is better; every other metric is a time where smaller is better
+HIGHER_IS_BETTER = ("_per_second",)
+# metric name suffixes for exact work counts rather than timings
+EXACT = ("_backtracks",)
+
+
+def best_of(repeat, function):
+    """
+    Runs function repeat times and returns the fastest wall time in seconds.
+    """""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_generate(count, repeat):
+    results = {}
+    for level, removed in DIFFICULTY_REMOVED.items():
+        seconds = best_of(repeat, lambda: [generate_sudoku(9, removed, seed=seed) for seed in range(count)])
+        results[f"generate_{level}_per_second"] = count / seconds
+    return results
+
+
+def bench_fill(count, repeat):
+    results = {}
+    for name, mrv in (("fill_remaining", False), ("fill_remaining_mrv", True)):
+        backtracks = []
+        for seed in range(count):
+            metrics = Metrics()
+            InstrumentedSudokuGenerator(9, 0, seed=seed, mrv=mrv, metrics=metrics).fill_values()
+            backtracks.append(metrics.counters.get("fill_remaining_backtracks", 0))
+        results[f"{name}_mean_backtracks"] = statistics.mean(backtracks)
+        results[f"{name}_max_backtracks"] = max(backtracks)
+        seconds = best_of(repeat, lambda: [SudokuGenerator(9, 0, seed=seed, mrv=mrv).fill_values()
+                                           for seed in range(count)])
+        results[f"{name}_ms"] = seconds / count * 1000
+    return results
+
+
+def bench_remove_cells(count, repeat):
+    results = {}
+    solutions = []
+    for seed in range(count):
+        generator = SudokuGenerator(9, 0, seed=seed)
+        generator.fill_values()
+        solutions.append(generator.board)
+
+    for name, unique in (("remove_cells", False), ("remove_cells_unique", True)):
+        def run():
+            for seed, solution in enumerate(solutions):
+                # a fresh generator per board so every repeat removes from the same full board
+                generator = SudokuGenerator(9, DIFFICULTY_REMOVED["hard"], unique=unique, seed=seed)
+                for row in range(9):
+                    for col in range(9):
+                        generator.set_value(row, col, solution[row][col])
+                generator.remove_cells()
+
+        results[f"{name}_ms"] = best_of(repeat, run) / count * 1000
+    return results
+
+
+def bench_solve(count, repeat):
+    puzzles = [generate_sudoku(9, DIFFICULTY_REMOVED["hard"], unique=True, seed=seed) for seed in range(count)]
+    seconds = best_of(repeat, lambda: [solve(puzzle) for puzzle in puzzles])
+    return {"solve_hard_ms": seconds / count * 1000}
+
+
+def bench_check_board(count, repeat, board_class=None):
+    boards = [solve(generate_sudoku(9, 40, seed=seed)) for seed in range(count)]
+    results = {"check_board_us": best_of(repeat, lambda: [check_board(board) for board in boards])
+               / count * 1e6}
+    if board_class is not None:
+        models = [board_class(9, 9, None, "easy", board) for board in boards]
+        results["board_check_board_us"] = best_of(repeat, lambda: [model.check_board() for model in models]) \
+            / count * 1e6
+    return results
+
+
+def bench_draw(frames, repeat):
+    import pygame
+    import sudoku
+
+    pygame.init()
+    try:
+        screen = pygame.display.set_mode((540, 600))
+        board = sudoku.Board(9, 9, screen, "easy", generate_sudoku(9, 40, seed=0))
+        static_layer = screen.copy()
+
+        def full():
+            for _ in range(frames):
+                board.draw()
+
+        def dirty():
+            for frame in range(frames):
+                board.select(frame % 9, (frame // 9) % 9)
+                board.draw_dirty(static_layer)
+
+        def idle():
+            for _ in range(frames):
+                board.draw_dirty(static_layer)
+
+        return {
+            "board_draw_full_ms": best_of(repeat, full) / frames * 1000,
+            "board_draw_dirty_ms": best_of(repeat, dirty) / frames * 1000,
+            "board_draw_idle_ms": best_of(repeat, idle) / frames * 1000,
+        }
+    finally:
+        sudoku.text_cache.clear()
+        pygame.quit()
+
+
+def run(quick=False):
+    scale = 1 if quick else 5
+    repeat = 3
+    metrics = {}
+    metrics.update(bench_generate(20 * scale, repeat))
+    metrics.update(bench_fill(20 * scale, repeat))
+    metrics.update(bench_remove_cells(4 * scale, repeat))
+    metrics.update(bench_solve(10 * scale, repeat))
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    try:
+        import pygame
+        import sudoku
+    except ImportError:
+        metrics.update(bench_check_board(200 * scale, repeat))
+    else:
+        pygame.init()
+        metrics.update(bench_check_board(200 * scale, repeat, sudoku.Board))
+        metrics.update(bench_draw(30 * scale, repeat))
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "quick": quick,
+        "metrics": metrics,
+    }
+
+
+'''
+Compares results against a baseline
+
+Parameters:
+results and baseline are dicts returned by run()
+tolerance is the allowed fractional slowdown for timing metrics
+
+Return: list of str (one line per regression)
+'''
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, base in baseline["metrics"].items():
+        value = results["metrics"].get(name)
+        if value is None:
+            continue
+        if name.endswith(EXACT):
+            if value > base:
+                regressions.append(f"{name}: {value} (baseline {base})")
+        elif name.endswith(HIGHER_IS_BETTER):
+            if value < base * (1 - tolerance):
+                regressions.append(f"{name}: {value:.4g} (baseline {base:.4g})")
+        elif value > base * (1 + tolerance):
+            regressions.append(f"{name}: {value:.4g} (baseline {base:.4g})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the sudoku benchmarks")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads for a fast check")
+    parser.add_argument("--output", default=None, help="write the JSON results here")
+    parser.add_argument("--baseline", default=BASELINE, help=f"baseline file (default {BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.20)
+    args = parser.parse_args()
+
+    results = run(args.quick)
+    for name, value in results["metrics"].items():
+        print(f"{name}: {value:.4g}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("quick") != results["quick"]:
+            print("baseline was recorded with a different --quick setting, not comparing")
+            return
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
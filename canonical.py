@@ -0,0 +1,392 @@
+"""
+Canonical forms of boards, and a solution cache keyed by them.
+
+Relabeling the digits, transposing, reordering the bands, the rows within a band, the stacks and the
+columns within a stack all turn a sudoku into another valid sudoku with the same number of solutions
+(rotations and reflections are combinations of these). canonicalize() picks one representative of all
+the boards reachable this way: the smallest when read row by row, with digits numbered in order of
+first appearance and empty cells (0) sorting first. Two boards get the same canonical board exactly
+when one can be turned into the other.
+
+The search builds the canonical board one row at a time and only keeps the orderings that give the
+smallest row so far. Typical 9x9 puzzles have few such ties, so this takes a few milliseconds; a full
+solution grid has many more. Boards with almost no givens tie nearly everywhere, so the search gives up
+after MAX_STEPS steps and raises TooSymmetric rather than run for minutes; SolutionCache then solves the
+board without caching it.
+
+SolutionCache keeps the solution, the number of solutions (up to 2) and the grader score of each
+canonical puzzle in an LRU, optionally backed by a dbm file, so equivalent puzzles are only solved once.
+
+    python canonical.py dedup puzzle_banks/easy.bank easy_unique.bank
+
+"""
+
+import dbm
+import itertools
+import math
+import struct
+from collections import OrderedDict, namedtuple
+
+from compact_board import CompactBoard
+from dlx_solver import count_solutions, solve
+from grader import grade
+from sudoku_generator import check_board
+
+Canonical = namedtuple("Canonical", ["board", "transposed", "rows", "cols", "labels"])
+Canonical.__doc__ = """
+board      - the canonical board, a CompactBoard
+transposed - True if the board was transposed first
+rows, cols - canonical row i / column j is row rows[i] / column cols[j] of the (transposed) board
+labels     - labels[digit] is the canonical digit for digit (labels[0] is 0)
+"""
+
+CacheEntry = namedtuple("CacheEntry", ["solution", "solutions", "difficulty"])
+
+# search budget, counted as column orders seeded plus candidate rows tried; a 9x9 puzzle typically takes
+# a few thousand and a full 9x9 grid about 50000, while a nearly empty board would take billions
+MAX_STEPS = 200000
+
+ENTRY = struct.Struct("<BH")
+
+
+class TooSymmetric(ValueError):
+    """
+    Raised by canonicalize when a board has so many equivalent orderings that the search passes MAX_STEPS.
+    """""
+
+
+'''
+Returns every column order that puts a row's empty cells as far left as possible
+Stacks with more empty cells come first and, within a stack, empty cells come before filled ones.
+Stacks with the same number of empty cells, and the cells of the same kind within a stack, can go in
+any order, so every combination is returned.
+
+Parameters:
+values is one row of the board
+box is the box length
+
+Return: list of tuple (column indexes, left to right)
+'''
+
+
+def _column_orders(values, box):
+    stacks = {}
+    for stack in range(box):
+        columns = range(stack * box, (stack + 1) * box)
+        empty = [col for col in columns if not values[col]]
+        filled = [col for col in columns if values[col]]
+        inner = [a + b for a in itertools.permutations(empty) for b in itertools.permutations(filled)]
+        stacks.setdefault(len(empty), []).append(inner)
+
+    groups = []
+    for _, tied in sorted(stacks.items(), reverse=True):
+        # tied stacks can come in any order, each with any of its inner orders
+        groups.append([sum(inners, ()) for order in itertools.permutations(tied)
+                       for inners in itertools.product(*order)])
+    return [sum(parts, ()) for parts in itertools.product(*groups)]
+
+
+'''
+Returns how many column orders _column_orders would return, without building them
+
+Parameters:
+values is one row of the board
+box is the box length
+
+Return: int
+'''
+
+
+def _column_order_count(values, box):
+    count = 1
+    tied = {}
+    for stack in range(box):
+        empty = sum(1 for col in range(stack * box, (stack + 1) * box) if not values[col])
+        count *= math.factorial(empty) * math.factorial(box - empty)
+        tied[empty] = tied.get(empty, 0) + 1
+    for stacks in tied.values():
+        count *= math.factorial(stacks)
+    return count
+
+
+'''
+Finds the canonical form of a board
+
+Parameters:
+board is a 2D list of ints (or a CompactBoard) where 0 is an empty cell
+
+Return: Canonical
+Raises TooSymmetric if the search would take more than MAX_STEPS steps
+'''
+
+
+def canonicalize(board):
+    size = len(board)
+    box = math.isqrt(size)
+    if box * box != size:
+        raise ValueError(f"board size {size} is not a perfect square")
+    rows = [tuple(row) for row in board]
+    grids = (rows, list(zip(*rows)))
+
+    # the first row depends only on where its empty cells can be moved to: its filled cells always read
+    # 1, 2, 3, ... so the rows that can put the most empty cells furthest left are the only starts kept
+    starts = []
+    best = None
+    for transposed, grid in enumerate(grids):
+        for first, values in enumerate(grid):
+            empty = sorted((sum(1 for col in range(stack * box, (stack + 1) * box) if not values[col])
+                            for stack in range(box)), reverse=True)
+            line = []
+            label = 0
+            for count in empty:
+                line.extend([0] * count)
+                line.extend(range(label + 1, label + 1 + box - count))
+                label += box - count
+            if best is None or line < best:
+                best = line
+                starts = []
+            if line == best:
+                starts.append((transposed, first))
+
+    steps = 0
+    for transposed, first in starts:
+        steps += _column_order_count(grids[transposed][first], box)
+    if steps > MAX_STEPS:
+        raise TooSymmetric("board is too symmetric to canonicalize")
+    states = []
+    for transposed, first in starts:
+        values = grids[transposed][first]
+        for cols in _column_orders(values, box):
+            labels = [0] * (size + 1)
+            label = 0
+            for col in cols:
+                if values[col]:
+                    label += 1
+                    labels[values[col]] = label
+            states.append((transposed, (first,), cols, labels, label))
+    best_rows = [tuple(best)]
+
+    for position in range(1, size):
+        best = None
+        next_states = []
+        for transposed, order, cols, labels, label in states:
+            grid = grids[transposed]
+            if position % box:
+                band = order[position - position % box] // box
+                choices = [row for row in range(band * box, (band + 1) * box) if row not in order]
+            else:
+                used = {order[start] // box for start in range(0, position, box)}
+                choices = [row for row in range(size) if row // box not in used]
+            steps += len(choices)
+            if steps > MAX_STEPS:
+                raise TooSymmetric("board is too symmetric to canonicalize")
+            for row in choices:
+                values = grid[row]
+                line = []
+                new = {}
+                next_label = label
+                for col in cols:
+                    value = values[col]
+                    if not value:
+                        line.append(0)
+                    elif labels[value]:
+                        line.append(labels[value])
+                    else:
+                        if value not in new:
+                            next_label += 1
+                            new[value] = next_label
+                        line.append(new[value])
+                    if best is not None and line > best[:len(line)]:
+                        break
+                else:
+                    if best is None or line < best:
+                        best = line
+                        next_states = []
+                    row_labels = labels
+                    if new:
+                        row_labels = labels[:]
+                        for value, assigned in new.items():
+                            row_labels[value] = assigned
+                    next_states.append((transposed, order + (row,), cols, row_labels, next_label))
+        states = next_states
+        best_rows.append(tuple(best))
+
+    transposed, order, cols, labels, label = states[0]
+    # digits that never appear get the remaining labels in increasing order
+    for digit in range(1, size + 1):
+        if not labels[digit]:
+            label += 1
+            labels[digit] = label
+    cells = [value for row in best_rows for value in row]
+    return Canonical(CompactBoard(cells, size), bool(transposed), order, cols, tuple(labels))
+
+
+'''
+Maps a board given in canonical coordinates and digits (such as the solution of a canonical puzzle)
+back to the coordinates and digits of the board that was canonicalized
+
+Parameters:
+board is a 2D list of ints or a CompactBoard in canonical form
+canonical is the Canonical returned by canonicalize
+
+Return: list[list]
+'''
+
+
+def from_canonical(board, canonical):
+    size = len(board)
+    digits = [0] * (size + 1)
+    for digit, label in enumerate(canonical.labels):
+        digits[label] = digit
+    out = [[0] * size for _ in range(size)]
+    for i, row in enumerate(canonical.rows):
+        values = board[i]
+        for j, col in enumerate(canonical.cols):
+            out[row][col] = digits[values[j]]
+    if canonical.transposed:
+        out = [list(row) for row in zip(*out)]
+    return out
+
+
+def _key(board):
+    return bytes([board.size]) + (board.pack() if board.size <= 15 else bytes(board))
+
+
+class SolutionCache:
+    """
+    LRU cache of (solution, number of solutions, difficulty) per canonical puzzle.
+
+    capacity is the number of entries kept in memory. path, if given, is a dbm file every entry is also
+    written to and looked up in when it is not in memory, so the cache survives restarts.
+    Entries are stored in canonical form; lookup maps the solution back onto the board that was asked for.
+    Boards too symmetric to canonicalize are solved directly and not cached.
+    """""
+
+    def __init__(self, capacity=4096, path=None):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.db = dbm.open(path, "c") if path is not None else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.uncached = 0
+
+    def _load(self, key, size):
+        if self.db is None:
+            return None
+        data = self.db.get(key)
+        if data is None:
+            return None
+        solutions, difficulty = ENTRY.unpack_from(data)
+        solution = CompactBoard.from_bytes(data[ENTRY.size:], size) if len(data) > ENTRY.size else None
+        return CacheEntry(solution, solutions, difficulty)
+
+    def _store(self, key, entry):
+        self.entries[key] = entry
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def lookup(self, board):
+        """
+        Returns the CacheEntry for board, solving and grading its canonical form on a miss.
+        solution is None when the board has no solution (or breaks the rules).
+        """""
+        try:
+            canonical = canonicalize(board)
+        except TooSymmetric:
+            self.uncached += 1
+            rows = board.to_rows() if isinstance(board, CompactBoard) else [list(row) for row in board]
+            entry = self._compute(rows)
+            return entry._replace(solution=entry.solution.to_rows() if entry.solution is not None else None)
+        key = _key(canonical.board)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        else:
+            entry = self._load(key, canonical.board.size)
+            if entry is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                entry = self._compute(canonical.board.to_rows())
+                if self.db is not None:
+                    solution = bytes(entry.solution) if entry.solution is not None else b""
+                    self.db[key] = ENTRY.pack(entry.solutions, entry.difficulty) + solution
+            self._store(key, entry)
+        solution = from_canonical(entry.solution, canonical) if entry.solution is not None else None
+        return CacheEntry(solution, entry.solutions, entry.difficulty)
+
+    def _compute(self, rows):
+        if not check_board(rows):
+            return CacheEntry(None, 0, 0)
+        solutions = count_solutions(rows, 2)
+        solution = CompactBoard.from_rows(solve(rows)) if solutions else None
+        return CacheEntry(solution, solutions, min(grade(rows).score, 0xFFFF))
+
+    def stats(self):
+        return {"entries": len(self.entries), "hits": self.hits, "disk_hits": self.disk_hits,
+                "misses": self.misses, "uncached": self.uncached}
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+'''
+Copies a puzzle bank, dropping every puzzle that is equivalent to one already copied
+Puzzles too symmetric to canonicalize are only dropped as exact copies
+
+Parameters:
+source is the path of the bank to read
+destination is the path of the bank to write (appended to if it exists)
+
+Return: tuple (kept, dropped)
+'''
+
+
+def dedup_bank(source, destination):
+    # imported here because puzzle_bank is only needed for this
+    from puzzle_bank import PuzzleBank, PuzzleBankWriter
+
+    seen = set()
+    kept = dropped = 0
+    with PuzzleBank(source) as bank, PuzzleBankWriter(destination, bank.size) as writer:
+        for index in range(len(bank)):
+            record = bank[index]
+            try:
+                key = _key(canonicalize(record.puzzle).board)
+            except TooSymmetric:
+                key = _key(record.puzzle)
+            if key in seen:
+                dropped += 1
+                continue
+            seen.add(key)
+            writer.append(*record)
+            kept += 1
+    return kept, dropped
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Canonical forms of sudoku boards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    dedup = commands.add_parser("dedup", help="copy a puzzle bank without equivalent duplicates")
+    dedup.add_argument("source")
+    dedup.add_argument("destination")
+    args = parser.parse_args(argv)
+
+    kept, dropped = dedup_bank(args.source, args.destination)
+    print(f"kept {kept}, dropped {dropped} duplicates")
+
+
+if __name__ == "__main__":
+    main()
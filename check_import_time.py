@@ -0,0 +1,66 @@
+"""
+Import-time budget for the puzzle core.
+
+Batch workers and services import sudoku_generator in fresh processes, so its import cost is paid on
+every spawn. This script imports each core module in a new interpreter several times, reports the best
+time, and exits with status 1 if any module is over its budget or pulls in pygame.
+
+Usage: python check_import_time.py
+
+"""
+
+import os
+import subprocess
+import sys
+
+RUNS = 5
+
+# module -> budget in seconds for a cold import in a fresh interpreter
+BUDGETS = {
+    "sudoku_generator": 0.050,
+    "dlx_solver": 0.010,
+    "compact_board": 0.010,
+    "batch_generator": 0.100,
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start, "pygame" in sys.modules)
+"""
+
+
+def measure(module):
+    """
+    Returns (best import time in seconds over RUNS fresh interpreters, whether pygame got imported).
+    """""
+    here = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    loads_pygame = False
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], cwd=here,
+                                capture_output=True, text=True, check=True).stdout.split()
+        seconds = float(output[0])
+        loads_pygame = loads_pygame or output[1] == "True"
+        best = seconds if best is None else min(best, seconds)
+    return best, loads_pygame
+
+
+def main():
+    failed = False
+    for module, budget in BUDGETS.items():
+        seconds, loads_pygame = measure(module)
+        status = "ok"
+        if loads_pygame:
+            status = "FAIL (imports pygame)"
+            failed = True
+        elif seconds > budget:
+            status = "FAIL (over budget)"
+            failed = True
+        print(f"{module}: {seconds * 1000:.1f} ms (budget {budget * 1000:.0f} ms) {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Compact board representation for storing and moving large numbers of puzzles.
+
+A CompactBoard keeps every cell in one flat array('B') (81 bytes for a 9x9 board) instead of a list of
+lists of ints. board[row] returns a memoryview over that row, so board[row][col] works just like the
+nested-list form without copying anything. pack() squeezes the board further to 4 bits per cell.
+
+"""
+
+from array import array
+
+
+class CompactBoard:
+    """
+    A size x size board stored row by row in a flat array('B'), with 0 meaning an empty cell.
+    """""
+
+    __slots__ = ("size", "cells")
+
+    def __init__(self, cells, size=9):
+        if not isinstance(cells, array):
+            cells = array("B", cells)
+        if len(cells) != size * size:
+            raise ValueError(f"expected {size * size} cells, got {len(cells)}")
+        self.size = size
+        self.cells = cells
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds a CompactBoard from the nested-list form that generate_sudoku returns.
+        """""
+        cells = array("B")
+        for row in rows:
+            cells.extend(row)
+        return cls(cells, len(rows))
+
+    @classmethod
+    def from_bytes(cls, data, size=9):
+        """
+        Builds a CompactBoard from one byte per cell, as returned by bytes(board).
+        """""
+        return cls(array("B", data), size)
+
+    def to_rows(self):
+        """
+        Returns the board as a new 2D list of ints.
+        """""
+        size = self.size
+        return [self.cells[start:start + size].tolist() for start in range(0, size * size, size)]
+
+    def __getitem__(self, row):
+        start = row * self.size
+        return memoryview(self.cells)[start:start + self.size]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for row in range(self.size):
+            yield self[row]
+
+    def __bytes__(self):
+        return self.cells.tobytes()
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactBoard):
+            return NotImplemented
+        return self.size == other.size and self.cells == other.cells
+
+    def __hash__(self):
+        return hash((self.size, self.cells.tobytes()))
+
+    def __repr__(self):
+        return f"CompactBoard({self.cells.tobytes()!r}, size={self.size})"
+
+    def pack(self):
+        """
+        Encodes the board at 4 bits per cell, two cells per byte (41 bytes for a 9x9 board).
+        Only boards whose values fit in 4 bits (size 15 or less) can be packed.
+        """""
+        if self.size > 15:
+            raise ValueError(f"a {self.size}x{self.size} board does not fit in 4 bits per cell")
+        cells = self.cells
+        packed = bytearray((len(cells) + 1) // 2)
+        for i in range(0, len(cells) - 1, 2):
+            packed[i // 2] = (cells[i] << 4) | cells[i + 1]
+        if len(cells) % 2:
+            packed[-1] = cells[-1] << 4
+        return bytes(packed)
+
+    @classmethod
+    def unpack(cls, data, size=9):
+        """
+        Decodes a board produced by pack().
+        """""
+        count = size * size
+        cells = array("B", bytes(count))
+        for i in range(count):
+            byte = data[i // 2]
+            cells[i] = byte & 0x0F if i % 2 else byte >> 4
+        return cls(cells, size)
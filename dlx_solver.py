@@ -0,0 +1,241 @@
+"""
+Exact cover sudoku solver using Knuth's Algorithm X with dancing links.
+https://arxiv.org/abs/cs/0011047
+
+Boards use the same format that generate_sudoku returns: a 2D list of ints where 0 is an empty cell.
+Any perfect-square size works (4x4, 9x9, 16x16, ...).
+
+"""
+
+
+class DancingLinks:
+    """
+    A sparse 0/1 matrix stored as circular doubly linked lists.
+    Node 0 is the root header, nodes 1..num_columns are the column headers
+    and every node after that belongs to a row added with add_row.
+    """""
+
+    def __init__(self, num_columns):
+        count = num_columns + 1
+        self.left = [i - 1 for i in range(count)]
+        self.right = [i + 1 for i in range(count)]
+        self.left[0] = num_columns
+        self.right[num_columns] = 0
+        self.up = list(range(count))
+        self.down = list(range(count))
+        self.column = list(range(count))
+        self.size = [0] * count
+        self.row_id = [None] * count
+
+    def add_row(self, row_id, columns):
+        """
+        Appends a row with a 1 in each of the given columns (numbered from 1).
+        """""
+        first = None
+        for col in columns:
+            node = len(self.column)
+            self.column.append(col)
+            self.row_id.append(row_id)
+            # insert at the bottom of the column
+            self.up.append(self.up[col])
+            self.down.append(col)
+            self.down[self.up[col]] = node
+            self.up[col] = node
+            self.size[col] += 1
+            # insert at the end of the row
+            if first is None:
+                first = node
+                self.left.append(node)
+                self.right.append(node)
+            else:
+                self.left.append(self.left[first])
+                self.right.append(first)
+                self.right[self.left[first]] = node
+                self.left[first] = node
+
+    def cover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, col):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def search(self, limit=1, max_nodes=None):
+        """
+        Runs Algorithm X, always branching on the column with the fewest rows.
+        Stops once limit solutions have been found, or once max_nodes search nodes have been visited;
+        self.aborted tells the second case apart from having searched everything.
+        Returns (number of solutions found, row ids of the first solution or None).
+        """""
+        self.found = 0
+        self.first = None
+        self.nodes = 0
+        self.max_nodes = max_nodes
+        self.aborted = False
+        self._search([], limit)
+        return self.found, self.first
+
+    def _search(self, partial, limit):
+        right, down, column, size = self.right, self.down, self.column, self.size
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            self.aborted = True
+            return True
+        if right[0] == 0:
+            self.found += 1
+            if self.first is None:
+                self.first = [self.row_id[node] for node in partial]
+            return self.found >= limit
+
+        col = right[0]
+        best = col
+        while col != 0:
+            if size[col] < size[best]:
+                best = col
+                if size[col] <= 1:
+                    break
+            col = right[col]
+        if size[best] == 0:
+            return False
+
+        self.cover(best)
+        node = down[best]
+        while node != best:
+            partial.append(node)
+            j = right[node]
+            while j != node:
+                self.cover(column[j])
+                j = right[j]
+            done = self._search(partial, limit)
+            j = self.left[node]
+            while j != node:
+                self.uncover(column[j])
+                j = self.left[j]
+            partial.pop()
+            if done:
+                self.uncover(best)
+                return True
+            node = down[node]
+        self.uncover(best)
+        return False
+
+
+'''
+Builds the exact cover matrix for a board
+Each (row, col, num) choice covers four constraints: the cell is filled, and num appears once in the row,
+the column, and the box. Cells that are already filled only get the row for their given value, and
+empty cells skip any num already given in their row, column or box, which keeps the matrix small.
+With rng the rows are added in random order, so search tries the choices for each constraint in random
+order and the first solution it finds is a random one.
+
+Parameters:
+board is a 2D list of ints where 0 is an empty cell
+rng is a random.Random or None - shuffle the row order (default None, rows in board order)
+
+Return: DancingLinks
+'''
+
+
+def build_matrix(board, rng=None):
+    size = len(board)
+    box_length = int(size ** 0.5)
+    if box_length * box_length != size:
+        raise ValueError(f"board size {size} is not a perfect square")
+    cells = size * size
+    row_used = [0] * size
+    col_used = [0] * size
+    box_used = [0] * size
+    for row in range(size):
+        for col in range(size):
+            given = board[row][col]
+            if given:
+                bit = 1 << given
+                row_used[row] |= bit
+                col_used[col] |= bit
+                box_used[(row // box_length) * box_length + col // box_length] |= bit
+
+    choices = []
+    for row in range(size):
+        for col in range(size):
+            box = (row // box_length) * box_length + col // box_length
+            given = board[row][col]
+            if given:
+                nums = (given,)
+            else:
+                used = row_used[row] | col_used[col] | box_used[box]
+                nums = [num for num in range(1, size + 1) if not used & (1 << num)]
+            for num in nums:
+                choices.append((row, col, num, box))
+    if rng is not None:
+        rng.shuffle(choices)
+
+    links = DancingLinks(4 * cells)
+    for row, col, num, box in choices:
+        links.add_row(
+            (row, col, num),
+            (
+                1 + row * size + col,
+                1 + cells + row * size + num - 1,
+                1 + 2 * cells + col * size + num - 1,
+                1 + 3 * cells + box * size + num - 1,
+            ),
+        )
+    return links
+
+
+'''
+Finds the first solution of a board
+
+Parameters:
+board is a 2D list of ints where 0 is an empty cell
+
+Return: list[list] (the solved board) or None if the board has no solution
+'''
+
+
+def solve(board):
+    found, rows = build_matrix(board).search(limit=1)
+    if not found:
+        return None
+    solution = [[0] * len(board) for _ in board]
+    for row, col, num in rows:
+        solution[row][col] = num
+    return solution
+
+
+'''
+Counts the solutions of a board, stopping early once limit is reached
+count_solutions(board, 2) == 1 is the usual uniqueness test
+
+Parameters:
+board is a 2D list of ints where 0 is an empty cell
+limit is the most solutions to look for
+
+Return: int (between 0 and limit)
+'''
+
+
+def count_solutions(board, limit=2):
+    found, _ = build_matrix(board).search(limit=limit)
+    return found
@@ -0,0 +1,373 @@
+"""
+Human-style difficulty grading.
+
+grade() solves a puzzle the way a person would, using only logical techniques, and scores it by the
+hardest technique it needed; how often techniques were used only orders puzzles that need the same
+hardest technique. Candidates are kept as one bitmask per cell (bit n set means n is
+still possible) and placing a value only clears that bit from the cell's peers, so nothing is ever
+recomputed from scratch.
+
+Techniques, easiest first, with their weights:
+    hidden_single  1  - a value has only one place left in a row, column or box
+    naked_single   2  - a cell has only one candidate left
+    pointing       4  - a value's candidates in a box all lie in one row/column, so it leaves the rest of that line
+    box_line       4  - a value's candidates in a row/column all lie in one box, so it leaves the rest of that box
+    naked_pair     5  - two cells in a unit share the same two candidates, which leave the rest of the unit
+    hidden_pair    6  - two values in a unit fit only the same two cells, which drop every other candidate
+    x_wing        10  - a value fits exactly two cells in each of two rows (or columns), in the same two lines
+    guess         50  - logic alone got stuck; added once and the puzzle counts as unsolved
+
+The score is TIER * (weight of the hardest technique used) plus the weighted sum of every use, capped
+at TIER - 1, so a puzzle that needs a harder technique always outscores one that does not, however many
+cells it has empty.
+
+"""
+
+import math
+from collections import namedtuple
+
+GradeResult = namedtuple("GradeResult", ["score", "techniques", "counts", "solved"])
+Hint = namedtuple("Hint", ["technique", "row", "col", "value"])
+
+WEIGHTS = {
+    "hidden_single": 1,
+    "naked_single": 2,
+    "pointing": 4,
+    "box_line": 4,
+    "naked_pair": 5,
+    "hidden_pair": 6,
+    "x_wing": 10,
+    "guess": 50,
+}
+
+# score points per unit of the hardest technique's weight; the weighted use count stays below this
+TIER = 100
+
+_geometry = {}
+
+
+class Geometry:
+    """
+    Cell indices of every unit and peer list for one board size, built once per size.
+    Cells are numbered row * size + col.
+    """""
+
+    def __init__(self, size):
+        box = math.isqrt(size)
+        self.size = size
+        self.rows = [[row * size + col for col in range(size)] for row in range(size)]
+        self.cols = [[row * size + col for row in range(size)] for col in range(size)]
+        self.boxes = [[(band * box + r) * size + stack * box + c for r in range(box) for c in range(box)]
+                      for band in range(box) for stack in range(box)]
+        self.units = self.rows + self.cols + self.boxes
+        self.box_of = [(cell // size // box) * box + (cell % size) // box for cell in range(size * size)]
+        self.peers = []
+        for cell in range(size * size):
+            row, col = divmod(cell, size)
+            peers = set(self.rows[row]) | set(self.cols[col]) | set(self.boxes[self.box_of[cell]])
+            peers.discard(cell)
+            self.peers.append(tuple(peers))
+
+
+def get_geometry(size):
+    geometry = _geometry.get(size)
+    if geometry is None:
+        geometry = _geometry[size] = Geometry(size)
+    return geometry
+
+
+class Contradiction(Exception):
+    pass
+
+
+class CandidateState:
+    """
+    Values and candidate bitmasks for every cell of a board that is being solved.
+    """""
+
+    def __init__(self, board):
+        size = len(board)
+        self.geometry = get_geometry(size)
+        self.size = size
+        self.all_values = ((1 << (size + 1)) - 1) & ~1
+        self.values = [0] * (size * size)
+        self.candidates = [self.all_values] * (size * size)
+        self.empty = size * size
+        for row in range(size):
+            for col in range(size):
+                if board[row][col]:
+                    self.place(row * size + col, board[row][col])
+
+    @classmethod
+    def from_candidates(cls, board, candidates):
+        """
+        Builds the state from candidate masks that are already known instead of placing every value again.
+        candidates is laid out like self.candidates (cell row * size + col, 0 for a filled cell) and is copied.
+        """""
+        state = cls.__new__(cls)
+        size = len(board)
+        state.geometry = get_geometry(size)
+        state.size = size
+        state.all_values = ((1 << (size + 1)) - 1) & ~1
+        state.values = [board[row][col] for row in range(size) for col in range(size)]
+        state.candidates = list(candidates)
+        state.empty = state.values.count(0)
+        return state
+
+    def place(self, cell, value):
+        bit = 1 << value
+        if self.values[cell] or not self.candidates[cell] & bit:
+            raise Contradiction(f"{value} cannot go in cell {cell}")
+        self.values[cell] = value
+        self.candidates[cell] = 0
+        self.empty -= 1
+        candidates = self.candidates
+        for peer in self.geometry.peers[cell]:
+            candidates[peer] &= ~bit
+
+    def eliminate(self, cell, mask):
+        """
+        Removes the values in mask from a cell's candidates; returns True if anything was removed.
+        """""
+        before = self.candidates[cell]
+        after = before & ~mask
+        if after == before:
+            return False
+        if not after:
+            raise Contradiction(f"cell {cell} has no candidates left")
+        self.candidates[cell] = after
+        return True
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def hidden_single(state):
+    candidates = state.candidates
+    for unit in state.geometry.units:
+        once = twice = 0
+        for cell in unit:
+            twice |= once & candidates[cell]
+            once |= candidates[cell]
+        single = once & ~twice
+        if single:
+            value = single.bit_length() - 1
+            for cell in unit:
+                if candidates[cell] >> value & 1:
+                    state.place(cell, value)
+                    return 1
+    return 0
+
+
+def naked_single(state):
+    candidates, values = state.candidates, state.values
+    for cell, mask in enumerate(candidates):
+        if mask and not mask & (mask - 1):
+            state.place(cell, mask.bit_length() - 1)
+            return 1
+        if not mask and not values[cell]:
+            raise Contradiction(f"cell {cell} has no candidates left")
+    return 0
+
+
+def pointing(state):
+    geometry, candidates = state.geometry, state.candidates
+    size = state.size
+    for box in geometry.boxes:
+        for value in _bits(state.all_values):
+            bit = 1 << value
+            cells = [cell for cell in box if candidates[cell] & bit]
+            if len(cells) < 2:
+                continue
+            rows = {cell // size for cell in cells}
+            cols = {cell % size for cell in cells}
+            if len(rows) == 1:
+                line = geometry.rows[rows.pop()]
+            elif len(cols) == 1:
+                line = geometry.cols[cols.pop()]
+            else:
+                continue
+            changed = False
+            for cell in line:
+                if cell not in cells and state.eliminate(cell, bit):
+                    changed = True
+            if changed:
+                return 1
+    return 0
+
+
+def box_line(state):
+    geometry, candidates = state.geometry, state.candidates
+    for line in geometry.rows + geometry.cols:
+        for value in _bits(state.all_values):
+            bit = 1 << value
+            cells = [cell for cell in line if candidates[cell] & bit]
+            if len(cells) < 2:
+                continue
+            boxes = {geometry.box_of[cell] for cell in cells}
+            if len(boxes) != 1:
+                continue
+            changed = False
+            for cell in geometry.boxes[boxes.pop()]:
+                if cell not in cells and state.eliminate(cell, bit):
+                    changed = True
+            if changed:
+                return 1
+    return 0
+
+
+def naked_pair(state):
+    candidates = state.candidates
+    for unit in state.geometry.units:
+        seen = {}
+        for cell in unit:
+            mask = candidates[cell]
+            if bin(mask).count("1") != 2:
+                continue
+            if mask in seen:
+                pair = (seen[mask], cell)
+                changed = False
+                for other in unit:
+                    if other not in pair and state.eliminate(other, mask):
+                        changed = True
+                if changed:
+                    return 1
+            else:
+                seen[mask] = cell
+    return 0
+
+
+def hidden_pair(state):
+    candidates = state.candidates
+    for unit in state.geometry.units:
+        places = {}
+        for value in _bits(state.all_values):
+            cells = tuple(cell for cell in unit if candidates[cell] >> value & 1)
+            if len(cells) == 2:
+                places.setdefault(cells, []).append(value)
+        for cells, values in places.items():
+            if len(values) == 2:
+                keep = (1 << values[0]) | (1 << values[1])
+                changed = False
+                for cell in cells:
+                    if state.eliminate(cell, ~keep & state.all_values):
+                        changed = True
+                if changed:
+                    return 1
+    return 0
+
+
+def x_wing(state):
+    geometry, candidates = state.geometry, state.candidates
+    size = state.size
+    for lines, crosses, position in ((geometry.rows, geometry.cols, lambda cell: cell % size),
+                                     (geometry.cols, geometry.rows, lambda cell: cell // size)):
+        for value in _bits(state.all_values):
+            bit = 1 << value
+            pairs = {}
+            for index, line in enumerate(lines):
+                cells = [cell for cell in line if candidates[cell] & bit]
+                if len(cells) == 2:
+                    pairs.setdefault((position(cells[0]), position(cells[1])), []).append(index)
+            for (first, second), indexes in pairs.items():
+                if len(indexes) != 2:
+                    continue
+                changed = False
+                for cross in (crosses[first], crosses[second]):
+                    for cell in cross:
+                        if lines is geometry.rows:
+                            index = cell // size
+                        else:
+                            index = cell % size
+                        if index not in indexes and state.eliminate(cell, bit):
+                            changed = True
+                if changed:
+                    return 1
+    return 0
+
+
+TECHNIQUES = [
+    ("hidden_single", hidden_single),
+    ("naked_single", naked_single),
+    ("pointing", pointing),
+    ("box_line", box_line),
+    ("naked_pair", naked_pair),
+    ("hidden_pair", hidden_pair),
+    ("x_wing", x_wing),
+]
+
+
+'''
+Grades a puzzle by the logical techniques needed to solve it
+Each round applies the easiest technique that makes progress, so harder techniques are only counted
+when nothing easier works.
+
+Parameters:
+board is a 2D list of ints (or a CompactBoard) where 0 is an empty cell
+
+Return: GradeResult(score, techniques, counts, solved)
+    score is TIER * the largest weight used plus the weighted use count, capped at TIER - 1
+    techniques is the list of technique names used, easiest first
+    counts maps each technique name used to how many times it was applied
+    solved is False if the puzzle needed guessing (or has no solution)
+'''
+
+
+def grade(board):
+    counts = {}
+    try:
+        state = CandidateState(board)
+        while state.empty:
+            for name, technique in TECHNIQUES:
+                if technique(state):
+                    counts[name] = counts.get(name, 0) + 1
+                    break
+            else:
+                counts["guess"] = 1
+                break
+    except Contradiction:
+        counts["guess"] = 1
+    solved = "guess" not in counts
+    techniques = [name for name in WEIGHTS if name in counts]
+    uses = sum(WEIGHTS[name] * count for name, count in counts.items())
+    score = TIER * max((WEIGHTS[name] for name in counts), default=0) + min(uses, TIER - 1)
+    return GradeResult(score, techniques, counts, solved)
+
+
+'''
+Finds the next cell that logic can fill, for a hint
+Techniques are applied easiest first, as in grade, until one of them places a value. Eliminations made
+by harder techniques along the way are kept, so the hint names the hardest technique that was needed.
+
+Parameters:
+board is a 2D list of ints (or a CompactBoard) where 0 is an empty cell
+candidates is a list of candidate masks per cell, laid out as in CandidateState, or None to work them out
+from board (default None)
+
+Return: Hint(technique, row, col, value), or None if the board is full, contradictory or needs guessing
+'''
+
+
+def next_hint(board, candidates=None):
+    try:
+        state = CandidateState(board) if candidates is None else CandidateState.from_candidates(board, candidates)
+        hardest = 0
+        while state.empty:
+            values = state.values[:]
+            for index, (name, technique) in enumerate(TECHNIQUES):
+                if technique(state):
+                    hardest = max(hardest, index)
+                    break
+            else:
+                return None
+            if state.values != values:
+                cell = next(cell for cell, value in enumerate(values) if value != state.values[cell])
+                row, col = divmod(cell, state.size)
+                return Hint(TECHNIQUES[hardest][0], row, col, state.values[cell])
+    except Contradiction:
+        return None
+    return None
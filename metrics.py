@@ -0,0 +1,106 @@
+"""
+Opt-in counters and timings for the generator and the game loop.
+
+Nothing here runs unless a Metrics object is passed in: generate_sudoku(..., metrics=m) switches to an
+instrumented generator, and the game loop only times its phases when main() was given one (or the
+SUDOKU_METRICS environment variable is set). Without a Metrics object the hot paths are unchanged.
+
+    m = Metrics()
+    generate_sudoku(9, 40, metrics=m)
+    m.snapshot()   # {"counters": {...}, "maxima": {...}, "timings": {...}}
+    m.log_line()   # "boards_generated=1 fill_remaining_candidate_tests=1234 ..."
+
+"""
+
+import os
+import time
+
+
+class Metrics:
+    """
+    Named counters, running maxima and timings.
+    log_interval (seconds) makes maybe_log emit log_line() through log at most that often.
+    """""
+
+    def __init__(self, log_interval=None, log=print):
+        self.log_interval = log_interval
+        self.log = log
+        self.reset()
+
+    def reset(self):
+        self.counters = {}
+        self.maxima = {}
+        self.timings = {}
+        self.last_log = time.perf_counter()
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_max(self, name, value):
+        if value > self.maxima.get(name, value - 1):
+            self.maxima[name] = value
+
+    def add_time(self, name, seconds):
+        """
+        Records one sample of a timing: keeps the number of samples, the total and the worst.
+        """""
+        timing = self.timings.get(name)
+        if timing is None:
+            self.timings[name] = [1, seconds, seconds]
+        else:
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+
+    def snapshot(self):
+        return {
+            "counters": dict(self.counters),
+            "maxima": dict(self.maxima),
+            "timings": {
+                name: {
+                    "count": count,
+                    "total_ms": total * 1000,
+                    "mean_ms": total / count * 1000,
+                    "max_ms": worst * 1000,
+                }
+                for name, (count, total, worst) in self.timings.items()
+            },
+        }
+
+    def log_line(self):
+        parts = [f"{name}={value}" for name, value in self.counters.items()]
+        parts += [f"{name}={value}" for name, value in self.maxima.items()]
+        parts += [f"{name}_mean_ms={total / count * 1000:.3f} {name}_max_ms={worst * 1000:.3f}"
+                  for name, (count, total, worst) in self.timings.items()]
+        return " ".join(parts)
+
+    def maybe_log(self):
+        """
+        Emits a log line if log_interval seconds have passed since the last one.
+        """""
+        if self.log_interval is None:
+            return
+        now = time.perf_counter()
+        if now - self.last_log >= self.log_interval:
+            self.last_log = now
+            self.log(self.log_line())
+
+
+'''
+Builds a Metrics object if the SUDOKU_METRICS environment variable is set
+Its value is the log interval in seconds (e.g. SUDOKU_METRICS=10); any non-number means no periodic log
+
+Parameters: None
+Return: Metrics or None
+'''
+
+
+def metrics_from_env():
+    value = os.environ.get("SUDOKU_METRICS")
+    if not value:
+        return None
+    try:
+        return Metrics(log_interval=float(value))
+    except ValueError:
+        return Metrics()
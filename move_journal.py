@@ -0,0 +1,199 @@
+"""
+Undo/redo journal of board moves, and a small binary format for saving a game in progress.
+
+Every change to a cell is one delta packed into a single 32-bit int:
+
+    cell index (row * size + col)  - bits 20..31
+    old value                      - bits 15..19
+    new value                      - bits 10..14
+    old sketched value             - bits  5..9
+    new sketched value             - bits  0..4
+
+so values up to 31 fit and boards up to 25x25 work. A step is the deltas of one user action (placing a
+number, clearing, sketching, a reset); the journal keeps all deltas in one array('I') with the end
+offset of every step in a second one. Undo and redo hand the deltas of one step back to the board,
+which applies them to its cells, so nothing ever copies the board.
+
+Saved game layout (all integers little endian):
+    header     - magic b"SDKG", format version (uint8), board size (uint8), difficulty name length (uint8),
+                 position (uint32), step count (uint32), delta count (uint32)
+    difficulty - ascii name
+    givens     - the starting puzzle, CompactBoard.pack for boards up to 15x15, otherwise one byte per cell
+    steps      - step end offsets, uint32 each
+    deltas     - uint32 each
+
+"""
+
+import struct
+import sys
+from array import array
+
+from compact_board import CompactBoard
+
+MAGIC = b"SDKG"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBIII")
+
+
+'''
+Packs one cell change into a journal delta
+
+Parameters:
+cell is the cell index, row * size + col
+old and new are the value before and after the change
+old_sketch and new_sketch are the sketched value before and after the change
+
+Return: int
+'''
+
+
+def pack_delta(cell, old, new, old_sketch, new_sketch):
+    return cell << 20 | old << 15 | new << 10 | old_sketch << 5 | new_sketch
+
+
+'''
+Splits a journal delta back into its fields
+
+Parameters:
+delta is an int from pack_delta
+
+Return: tuple (cell, old, new, old_sketch, new_sketch)
+'''
+
+
+def unpack_delta(delta):
+    return delta >> 20, delta >> 15 & 31, delta >> 10 & 31, delta >> 5 & 31, delta & 31
+
+
+class MoveJournal:
+    """
+    Linear undo/redo history. position is the number of steps currently applied;
+    recording a new step after some undos drops the steps that could have been redone.
+    """""
+
+    def __init__(self):
+        self.deltas = array("I")
+        self.ends = array("I")
+        self.position = 0
+
+    def __len__(self):
+        return len(self.ends)
+
+    def _step(self, index):
+        start = self.ends[index - 1] if index else 0
+        return self.deltas[start:self.ends[index]]
+
+    def record(self, deltas):
+        """
+        Adds one step made of the given deltas. Empty steps are ignored.
+        """""
+        if not deltas:
+            return
+        if self.position < len(self.ends):
+            del self.deltas[self.ends[self.position - 1] if self.position else 0:]
+            del self.ends[self.position:]
+        self.deltas.extend(deltas)
+        self.ends.append(len(self.deltas))
+        self.position += 1
+
+    def can_undo(self):
+        return self.position > 0
+
+    def can_redo(self):
+        return self.position < len(self.ends)
+
+    def undo(self):
+        """
+        Steps back once and returns the deltas of the step to revert (apply their old values in reverse
+        order), or None if there is nothing to undo.
+        """""
+        if not self.position:
+            return None
+        self.position -= 1
+        return self._step(self.position)
+
+    def redo(self):
+        """
+        Steps forward once and returns the deltas of the step to reapply (apply their new values in order),
+        or None if there is nothing to redo.
+        """""
+        if self.position == len(self.ends):
+            return None
+        self.position += 1
+        return self._step(self.position - 1)
+
+    def clear(self):
+        del self.deltas[:]
+        del self.ends[:]
+        self.position = 0
+
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+'''
+Encodes a game in progress: its starting puzzle and the full journal, including steps that were undone
+
+Parameters:
+givens is the starting puzzle as a 2D list of ints or a CompactBoard
+journal is a MoveJournal
+difficulty is the difficulty name (default "")
+
+Return: bytes
+'''
+
+
+def save_game(givens, journal, difficulty=""):
+    if not isinstance(givens, CompactBoard):
+        givens = CompactBoard.from_rows(givens)
+    name = difficulty.encode("ascii")
+    header = HEADER.pack(MAGIC, VERSION, givens.size, len(name), journal.position, len(journal.ends),
+                         len(journal.deltas))
+    cells = givens.pack() if givens.size <= 15 else bytes(givens)
+    return b"".join((header, name, cells, _little_endian(journal.ends), _little_endian(journal.deltas)))
+
+
+'''
+Decodes a game saved by save_game
+
+Parameters:
+data is a bytes-like object
+
+Return: tuple (givens, journal, difficulty) - givens is a CompactBoard; the journal's position is the saved one
+'''
+
+
+def load_game(data):
+    data = memoryview(data)
+    if len(data) < HEADER.size:
+        raise ValueError("not a saved game (truncated header)")
+    magic, version, size, name_length, position, steps, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a saved game")
+    if version != VERSION:
+        raise ValueError(f"unsupported saved game version {version}")
+    cells_length = (size * size + 1) // 2 if size <= 15 else size * size
+    offset = HEADER.size
+    if len(data) != offset + name_length + cells_length + 4 * (steps + count):
+        raise ValueError("saved game is truncated or corrupt")
+
+    difficulty = bytes(data[offset:offset + name_length]).decode("ascii")
+    offset += name_length
+    cells = data[offset:offset + cells_length]
+    givens = CompactBoard.unpack(cells, size) if size <= 15 else CompactBoard.from_bytes(cells, size)
+    offset += cells_length
+
+    journal = MoveJournal()
+    journal.ends.frombytes(data[offset:offset + 4 * steps])
+    journal.deltas.frombytes(data[offset + 4 * steps:])
+    if sys.byteorder == "big":
+        journal.ends.byteswap()
+        journal.deltas.byteswap()
+    if position > steps or (steps and journal.ends[-1] != count):
+        raise ValueError("saved game is truncated or corrupt")
+    journal.position = position
+    return givens, journal, difficulty
@@ -0,0 +1,194 @@
+"""
+Binary puzzle bank: a file of pre-generated puzzles that can be served without calling generate_sudoku.
+
+Layout (all integers little endian):
+    header  - 32 bytes: magic b"SUDOKUBK", format version (uint16), board size (uint16),
+              record size (uint16), then zero padding
+    records - fixed width, one per puzzle, back to back:
+              puzzle (CompactBoard.pack), solution (CompactBoard.pack),
+              difficulty score (uint16), seed (uint64)
+
+The record count is not stored; it is (file size - header size) // record size, so the writer can
+append to an existing bank. The reader memory-maps the file and only touches the pages of the
+records it reads, so banks of tens of millions of puzzles open instantly.
+
+"""
+
+import mmap
+import os
+import random
+import struct
+from collections import namedtuple
+
+from compact_board import CompactBoard
+from grader import grade
+
+MAGIC = b"SUDOKUBK"
+VERSION = 1
+HEADER = struct.Struct("<8sHHH18x")
+
+BANK_DIR = "puzzle_banks"
+
+PuzzleRecord = namedtuple("PuzzleRecord", ["puzzle", "solution", "difficulty", "seed"])
+
+
+'''
+Returns the struct describing one record for boards of the given size
+
+Parameters:
+size is the number of rows/columns of the boards in the bank
+
+Return: struct.Struct
+'''
+
+
+def record_struct(size):
+    packed = (size * size + 1) // 2
+    return struct.Struct(f"<{packed}s{packed}sHQ")
+
+
+'''
+Returns the path of the bank file used for a difficulty level, e.g. puzzle_banks/easy.bank
+
+Parameters:
+difficulty is the difficulty name ("easy", "medium" or "hard")
+
+Return: str
+'''
+
+
+def bank_path(difficulty):
+    return os.path.join(BANK_DIR, f"{difficulty}.bank")
+
+
+class PuzzleBankWriter:
+    """
+    Appends records to a bank file, creating it with a header if it does not exist yet.
+    Use as a context manager so the file is flushed and closed.
+    """""
+
+    def __init__(self, path, size=9):
+        self.size = size
+        self.record = record_struct(size)
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, "rb") as f:
+                _check_header(f.read(HEADER.size), path, size)
+        self.file = open(path, "ab")
+        if not exists:
+            self.file.write(HEADER.pack(MAGIC, VERSION, size, self.record.size))
+
+    def append(self, puzzle, solution, difficulty, seed):
+        """
+        Writes one record. puzzle and solution can be 2D lists or CompactBoards.
+        """""
+        if not isinstance(puzzle, CompactBoard):
+            puzzle = CompactBoard.from_rows(puzzle)
+        if not isinstance(solution, CompactBoard):
+            solution = CompactBoard.from_rows(solution)
+        self.file.write(self.record.pack(puzzle.pack(), solution.pack(), difficulty, seed))
+
+    def append_generated(self, n, removed, seed=None, workers=None, unique=False):
+        """
+        Generates n puzzles with generate_many and appends each one with the solution it was carved from.
+        The difficulty score of each record is its grader.grade score, capped to fit in 16 bits.
+        """""
+        # imported here because batch_generator imports sudoku_generator, which imports this module
+        from batch_generator import generate_many, puzzle_seed
+
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        pairs = generate_many(n, removed, workers=workers, size=self.size, unique=unique, seed=seed, solutions=True)
+        for index, (board, solution) in enumerate(pairs):
+            self.append(board, solution, min(grade(board).score, 0xFFFF), puzzle_seed(seed, index))
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PuzzleBank:
+    """
+    Read-only, memory-mapped view of a bank file with random access by index.
+    """""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            _check_header(header, path)
+            self.size = HEADER.unpack(header)[2]
+            self.record = record_struct(self.size)
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = (len(self.map) - HEADER.size) // self.record.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("puzzle bank index out of range")
+        puzzle, solution, difficulty, seed = self.record.unpack_from(
+            self.map, HEADER.size + index * self.record.size)
+        return PuzzleRecord(CompactBoard.unpack(puzzle, self.size), CompactBoard.unpack(solution, self.size),
+                            difficulty, seed)
+
+    def random_record(self, rng=random):
+        """
+        Returns a uniformly chosen record.
+        """""
+        if not self.count:
+            raise IndexError("puzzle bank is empty")
+        return self[rng.randrange(self.count)]
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(header, path, size=None):
+    if len(header) != HEADER.size:
+        raise ValueError(f"{path} is not a puzzle bank (truncated header)")
+    magic, version, file_size, record_size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a puzzle bank")
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported bank version {version}")
+    if record_size != record_struct(file_size).size:
+        raise ValueError(f"{path} has a corrupt header")
+    if size is not None and file_size != size:
+        raise ValueError(f"{path} holds {file_size}x{file_size} boards, expected {size}x{size}")
+
+
+def main():
+    # imported here to keep it out of the import time of sudoku_generator, which imports this module
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Append generated puzzles to a puzzle bank")
+    parser.add_argument("difficulty", help="bank name, e.g. easy, medium or hard")
+    parser.add_argument("removed", type=int, help="number of cells to remove from each puzzle")
+    parser.add_argument("count", type=int, help="number of puzzles to generate")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--unique", action="store_true", help="only keep puzzles with one solution")
+    args = parser.parse_args()
+
+    os.makedirs(BANK_DIR, exist_ok=True)
+    with PuzzleBankWriter(bank_path(args.difficulty)) as writer:
+        writer.append_generated(args.count, args.removed, seed=args.seed, workers=args.workers,
+                                unique=args.unique)
+
+
+if __name__ == "__main__":
+    main()
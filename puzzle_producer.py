@@ -0,0 +1,112 @@
+"""
+Background puzzle pre-generation.
+
+PuzzleProducer keeps a bounded queue of ready puzzles for each difficulty and refills it on a process
+pool, so taking a puzzle when the player picks a difficulty (or restarts) is just a queue pop and the
+UI thread never runs the generator itself.
+
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+class PuzzleProducer:
+    """
+    Pre-generates puzzles for several difficulty levels in the background.
+
+    levels maps a difficulty name to the arguments passed to make_puzzle, e.g. {"easy": 30}.
+    make_puzzle(difficulty, arg) builds one puzzle; it runs in a worker process, so it must be a
+    module-level function.
+    depth is the number of ready puzzles kept per difficulty.
+    """""
+
+    def __init__(self, levels, make_puzzle, depth=3, workers=1, executor=None):
+        self.levels = dict(levels)
+        self.make_puzzle = make_puzzle
+        self.depth = depth
+        self.owns_executor = executor is None
+        self.executor = executor if executor is not None else ProcessPoolExecutor(max_workers=workers)
+        self.ready = {level: queue.Queue() for level in self.levels}
+        self.in_flight = {level: 0 for level in self.levels}
+        self.last_latency = {level: None for level in self.levels}
+        self.total_latency = {level: 0.0 for level in self.levels}
+        self.completed = {level: 0 for level in self.levels}
+        # reentrant because a callback added to an already finished future runs straight away
+        self.lock = threading.RLock()
+        self.closed = False
+        for level in self.levels:
+            self.refill(level)
+
+    def refill(self, level):
+        """
+        Submits jobs until ready + in-flight puzzles for level reach depth.
+        """""
+        with self.lock:
+            if self.closed:
+                return
+            missing = self.depth - self.ready[level].qsize() - self.in_flight[level]
+            for _ in range(missing):
+                self.in_flight[level] += 1
+                future = self.executor.submit(self.make_puzzle, level, self.levels[level])
+                future.add_done_callback(self._on_done(level, time.perf_counter()))
+
+    def _on_done(self, level, submitted):
+        def done(future):
+            with self.lock:
+                self.in_flight[level] -= 1
+                if future.cancelled():
+                    return
+                if future.exception() is not None:
+                    # handed to the next take() so a failing job does not leave it waiting forever
+                    self.ready[level].put(future.exception())
+                    return
+                latency = time.perf_counter() - submitted
+                self.last_latency[level] = latency
+                self.total_latency[level] += latency
+                self.completed[level] += 1
+                self.ready[level].put(future.result())
+        return done
+
+    def take(self, level):
+        """
+        Returns a ready puzzle for level and queues a replacement.
+        Only blocks if the queue is empty, and then only until the job already in flight finishes.
+        """""
+        try:
+            puzzle = self.ready[level].get_nowait()
+        except queue.Empty:
+            self.refill(level)
+            puzzle = self.ready[level].get()
+        self.refill(level)
+        if isinstance(puzzle, BaseException):
+            raise puzzle
+        return puzzle
+
+    def queue_depth(self, level):
+        return self.ready[level].qsize()
+
+    def stats(self):
+        """
+        Returns a snapshot per level: ready puzzles, jobs in flight, and the last and average refill
+        latency in seconds (None until a job has finished).
+        """""
+        with self.lock:
+            return {
+                level: {
+                    "ready": self.ready[level].qsize(),
+                    "in_flight": self.in_flight[level],
+                    "last_refill_seconds": self.last_latency[level],
+                    "avg_refill_seconds": (self.total_latency[level] / self.completed[level]
+                                           if self.completed[level] else None),
+                }
+                for level in self.levels
+            }
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+        if self.owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,515 @@
+"""
+Local HTTP/JSON puzzle service shared by any number of game frontends.
+
+    python puzzle_service.py --port 8765
+    python puzzle_service.py --load-test 2000 --concurrency 32      # serve on a free port and hammer it
+
+Endpoints (GET takes query parameters, POST a JSON object; responses are JSON):
+    /generate  difficulty=easy|medium|hard or removed=N, count=1, size=9, unique=false, max_attempts, seed,
+               solutions=false
+               -> {"puzzles": [{"puzzle": [[...]], "seed": ..., "solution": [[...]]}, ...]}
+    /solve     {"puzzle": board} -> {"solution": board or null}, or {"puzzles": [...]} -> {"solutions": [...]}
+    /validate  same input -> {"result": ...} or {"results": [...]}, each {"valid", "solved", "solutions"}
+               (solutions counts up to 2)
+    /grade     same input and output shape, each {"score", "techniques", "counts", "solved"} from grader.grade
+    /stats     cache depths, requests in progress and totals
+
+All CPU work (generating, solving, grading) runs on a process pool, so the event loop only parses
+requests and moves JSON. Batches are split into chunks of --chunk-size boards and the chunks run in
+parallel. At most --max-pending CPU requests are worked on at once; beyond that the service answers
+503 with Retry-After straight away rather than queueing without bound. Plain 9x9 puzzles for each
+difficulty are pre-generated into a warm cache of --cache-depth puzzles, so most /generate calls are
+answered without waiting for the pool. With --solution-cache N every worker keeps a canonical.SolutionCache
+of N puzzles, so /solve and /validate skip the solver for puzzles equivalent to ones it has seen.
+
+Only the standard library is used; the HTTP handling is a small HTTP/1.1 subset with keep-alive.
+
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from batch_generator import puzzle_seed
+from canonical import SolutionCache
+from dlx_solver import count_solutions, solve
+from grader import grade
+from sudoku_generator import DIFFICULTY_REMOVED, check_board, generate_sudoku
+
+MAX_BODY = 1 << 20
+MAX_BATCH = 1000
+
+
+class RequestError(Exception):
+    """
+    A request the service refuses; status is the HTTP status code to answer with.
+    """""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+'''
+Worker entry point: generates count puzzles starting at index start, each with its seed
+With solutions each record also gets the grid the generator carved the puzzle from, which costs a copy
+rather than a solve
+
+Parameters:
+args is a tuple (base_seed, start, count, size, removed, unique, solutions, max_attempts)
+
+Return: list of dict
+'''
+
+
+def _generate_records(args):
+    base_seed, start, count, size, removed, unique, solutions, max_attempts = args
+    records = []
+    for index in range(start, start + count):
+        seed = puzzle_seed(base_seed, index)
+        if solutions:
+            board, solution = generate_sudoku(size, removed, unique=unique, seed=seed, solution=True,
+                                              max_attempts=max_attempts)
+            records.append({"puzzle": board, "seed": seed, "solution": solution})
+        else:
+            board = generate_sudoku(size, removed, unique=unique, seed=seed, max_attempts=max_attempts)
+            records.append({"puzzle": board, "seed": seed})
+    return records
+
+
+# one per worker process, created by the first job that asks for it
+_solution_cache = None
+
+
+def _worker_cache(capacity):
+    global _solution_cache
+    if _solution_cache is None:
+        _solution_cache = SolutionCache(capacity)
+    return _solution_cache
+
+
+def _solve_boards(boards, cache_size=0):
+    if cache_size:
+        cache = _worker_cache(cache_size)
+        return [cache.lookup(board).solution for board in boards]
+    return [solve(board) if check_board(board) else None for board in boards]
+
+
+def _validate_boards(boards, cache_size=0):
+    cache = _worker_cache(cache_size) if cache_size else None
+    results = []
+    for board in boards:
+        valid = check_board(board)
+        if not valid:
+            solutions = 0
+        elif cache is not None:
+            solutions = cache.lookup(board).solutions
+        else:
+            solutions = count_solutions(board, 2)
+        results.append({
+            "valid": valid,
+            "solved": valid and all(all(row) for row in board),
+            "solutions": solutions,
+        })
+    return results
+
+
+def _grade_boards(boards):
+    results = []
+    for board in boards:
+        result = grade(board)
+        results.append({"score": result.score, "techniques": result.techniques, "counts": result.counts,
+                        "solved": result.solved})
+    return results
+
+
+'''
+Checks that a value from a request is a board: a square list of lists of ints, with a perfect-square size
+and every value between 0 and size
+
+Parameters:
+value is the decoded JSON value
+
+Return: list[list]
+'''
+
+
+def parse_board(value):
+    if not isinstance(value, list) or not value:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "a board must be a non-empty list of rows")
+    size = len(value)
+    if math.isqrt(size) ** 2 != size:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"board size {size} is not a perfect square")
+    for row in value:
+        if not isinstance(row, list) or len(row) != size:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"every row must be a list of {size} values")
+        for cell in row:
+            if type(cell) is not int or not 0 <= cell <= size:
+                raise RequestError(HTTPStatus.BAD_REQUEST, f"board values must be ints between 0 and {size}")
+    return value
+
+
+def _int_param(params, name, default, low, high):
+    value = params.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer") from None
+    if not low <= value <= high:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"{name} must be between {low} and {high}")
+    return value
+
+
+def _bool_param(params, name):
+    value = params.get(name, False)
+    if isinstance(value, str):
+        return value.lower() in ("1", "true", "yes")
+    return bool(value)
+
+
+class PuzzleService:
+    """
+    The request handlers, the warm cache and the process pool behind the HTTP server.
+
+    workers is the number of worker processes (default: os.cpu_count()); executor replaces the pool.
+    cache_depth is the number of ready puzzles kept per difficulty (0 turns the cache off).
+    max_pending is the most CPU requests handled at once before answering 503.
+    chunk_size is the number of boards per job sent to a worker.
+    solution_cache is the number of solved puzzles each worker keeps for /solve and /validate (0 for none).
+    """""
+
+    def __init__(self, workers=None, cache_depth=16, max_pending=64, chunk_size=16, executor=None,
+                 solution_cache=0):
+        self.owns_executor = executor is None
+        self.executor = executor if executor is not None else ProcessPoolExecutor(max_workers=workers)
+        self.cache_depth = cache_depth
+        self.max_pending = max_pending
+        self.chunk_size = chunk_size
+        self.solution_cache = solution_cache
+        self.active = 0
+        self.requests = 0
+        self.rejected = 0
+        self.cache_hits = 0
+        self.cache = {}
+        self.refill_tasks = []
+        self.server = None
+        self.routes = {
+            "/generate": (("GET", "POST"), self.generate),
+            "/solve": (("POST",), self.solve),
+            "/validate": (("POST",), self.validate),
+            "/grade": (("POST",), self.grade),
+            "/stats": (("GET",), self.stats),
+        }
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """
+        Starts the warm cache refills and the HTTP server; returns the asyncio server.
+        """""
+        if self.cache_depth:
+            for level, removed in DIFFICULTY_REMOVED.items():
+                self.cache[level] = asyncio.Queue(maxsize=self.cache_depth)
+                self.refill_tasks.append(asyncio.create_task(self._refill(level, removed)))
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        return self.server
+
+    async def close(self):
+        for task in self.refill_tasks:
+            task.cancel()
+        await asyncio.gather(*self.refill_tasks, return_exceptions=True)
+        self.refill_tasks = []
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.owns_executor:
+            self.executor.shutdown(cancel_futures=True)
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def _run_chunked(self, function, boards):
+        """
+        Runs function over boards in chunks of chunk_size, in parallel, and joins the results in order.
+        """""
+        chunks = [boards[start:start + self.chunk_size] for start in range(0, len(boards), self.chunk_size)]
+        results = await asyncio.gather(*(self._run(function, chunk) for chunk in chunks))
+        return [item for chunk in results for item in chunk]
+
+    async def _refill(self, level, removed):
+        queue = self.cache[level]
+        rng = random.SystemRandom()
+        while True:
+            # put() waits while the cache is full, so a full cache costs no CPU; solutions are kept since they
+            # are only a copy and a cached puzzle may go to a request that asks for them
+            count = min(self.chunk_size, queue.maxsize)
+            args = (rng.getrandbits(64), 0, count, 9, removed, False, True, None)
+            for record in await self._run(_generate_records, args):
+                await queue.put(record)
+
+    async def generate(self, params):
+        count = _int_param(params, "count", 1, 1, MAX_BATCH)
+        size = _int_param(params, "size", 9, 4, 25)
+        if math.isqrt(size) ** 2 != size:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"size {size} is not a perfect square")
+        unique = _bool_param(params, "unique")
+        difficulty = params.get("difficulty", "medium")
+        if "removed" in params:
+            removed = _int_param(params, "removed", 0, 0, size * size)
+        elif difficulty in DIFFICULTY_REMOVED:
+            removed = DIFFICULTY_REMOVED[difficulty]
+        else:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"unknown difficulty {difficulty!r}")
+        seed = params.get("seed")
+        if seed is not None:
+            seed = _int_param(params, "seed", 0, 0, (1 << 64) - 1)
+        solutions = _bool_param(params, "solutions")
+        max_attempts = params.get("max_attempts")
+        if max_attempts is not None:
+            max_attempts = _int_param(params, "max_attempts", 0, 0, size * size)
+
+        records = []
+        queue = self.cache.get(difficulty)
+        if queue is not None and seed is None and size == 9 and not unique and "removed" not in params:
+            while len(records) < count and not queue.empty():
+                records.append(queue.get_nowait())
+            self.cache_hits += len(records)
+        missing = count - len(records)
+        if missing:
+            base = seed if seed is not None else random.SystemRandom().getrandbits(64)
+            chunks = [(base, start, min(self.chunk_size, missing - start), size, removed, unique, solutions,
+                       max_attempts) for start in range(0, missing, self.chunk_size)]
+            for chunk in await asyncio.gather(*(self._run(_generate_records, args) for args in chunks)):
+                records.extend(chunk)
+
+        if not solutions:
+            records = [{"puzzle": record["puzzle"], "seed": record["seed"]} for record in records]
+        return {"puzzles": records}
+
+    async def _per_board(self, params, function, single, batch):
+        if "puzzles" in params:
+            boards = params["puzzles"]
+            if not isinstance(boards, list) or len(boards) > MAX_BATCH:
+                raise RequestError(HTTPStatus.BAD_REQUEST,
+                                   f"puzzles must be a list of at most {MAX_BATCH} boards")
+            return {batch: await self._run_chunked(function, [parse_board(board) for board in boards])}
+        if "puzzle" in params:
+            return {single: (await self._run(function, [parse_board(params["puzzle"])]))[0]}
+        raise RequestError(HTTPStatus.BAD_REQUEST, 'expected "puzzle" or "puzzles"')
+
+    async def solve(self, params):
+        function = functools.partial(_solve_boards, cache_size=self.solution_cache)
+        return await self._per_board(params, function, "solution", "solutions")
+
+    async def validate(self, params):
+        function = functools.partial(_validate_boards, cache_size=self.solution_cache)
+        return await self._per_board(params, function, "result", "results")
+
+    async def grade(self, params):
+        return await self._per_board(params, _grade_boards, "result", "results")
+
+    async def stats(self, params):
+        return {
+            "cache": {level: queue.qsize() for level, queue in self.cache.items()},
+            "active": self.active,
+            "max_pending": self.max_pending,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "cache_hits": self.cache_hits,
+        }
+
+    async def dispatch(self, method, target, body):
+        """
+        Routes one request; returns (status, payload dict).
+        """""
+        url = urlsplit(target)
+        route = self.routes.get(url.path)
+        if route is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"no endpoint {url.path}"}
+        methods, handler = route
+        if method not in methods:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{url.path} takes {' or '.join(methods)}"}
+        self.requests += 1
+
+        params = dict(parse_qsl(url.query))
+        if body:
+            try:
+                data = json.loads(body)
+            except ValueError:
+                return HTTPStatus.BAD_REQUEST, {"error": "body is not valid JSON"}
+            if not isinstance(data, dict):
+                return HTTPStatus.BAD_REQUEST, {"error": "body must be a JSON object"}
+            params.update(data)
+
+        if handler == self.stats:
+            return HTTPStatus.OK, await handler(params)
+        if self.active >= self.max_pending:
+            self.rejected += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "busy, retry later"}
+        self.active += 1
+        try:
+            return HTTPStatus.OK, await handler(params)
+        except RequestError as error:
+            return error.status, {"error": str(error)}
+        except Exception as error:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(error).__name__}: {error}"}
+        finally:
+            self.active -= 1
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode("latin-1").split()
+                length = headers.get("content-length", "0")
+                if len(parts) != 3 or not length.isdigit():
+                    await _respond(writer, HTTPStatus.BAD_REQUEST, {"error": "malformed request"}, False)
+                    break
+                if int(length) > MAX_BODY:
+                    await _respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "body too large"}, False)
+                    break
+                method, target, version = parts
+                body = await reader.readexactly(int(length)) if int(length) else b""
+
+                status, payload = await self.dispatch(method, target, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await _respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ValueError:
+            # readline raises ValueError for a request or header line longer than the stream limit (64 KiB)
+            try:
+                await _respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {"error": "header line too long"},
+                               False)
+            except ConnectionError:
+                pass
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _respond(writer, status, payload, keep_alive):
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    head = [f"HTTP/1.1 {status.value} {status.phrase}", "Content-Type: application/json",
+            f"Content-Length: {len(body)}", "Connection: " + ("keep-alive" if keep_alive else "close")]
+    if status == HTTPStatus.SERVICE_UNAVAILABLE:
+        head.append("Retry-After: 1")
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+async def _read_response(reader):
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+'''
+Sends requests to a running service over keep-alive connections and measures the responses
+
+Parameters:
+host and port are where the service listens
+total is the number of requests to send
+concurrency is the number of connections sending at the same time
+path is the request target, e.g. "/generate?difficulty=easy"
+
+Return: dict with requests per second, latency percentiles in ms and the count of each status code
+'''
+
+
+async def load_test(host, port, total, concurrency, path="/generate?difficulty=easy"):
+    latencies = []
+    statuses = {}
+    remaining = iter(range(total))
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for _ in remaining:
+                start = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+                status, _ = await _read_response(reader)
+                latencies.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests_per_second": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "statuses": statuses,
+    }
+
+
+async def _serve(args):
+    service = PuzzleService(workers=args.workers, cache_depth=args.cache_depth, max_pending=args.max_pending,
+                            chunk_size=args.chunk_size, solution_cache=args.solution_cache)
+    try:
+        server = await service.start(args.host, 0 if args.load_test else args.port)
+        port = server.sockets[0].getsockname()[1]
+        if not args.load_test:
+            print(f"serving on http://{args.host}:{port}")
+            await server.serve_forever()
+            return
+        # let the warm cache fill before measuring
+        await asyncio.sleep(args.warmup)
+        result = await load_test(args.host, port, args.load_test, args.concurrency, args.path)
+        print(json.dumps(result, indent=2))
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve puzzles over a local HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--cache-depth", type=int, default=16, help="ready puzzles kept per difficulty")
+    parser.add_argument("--max-pending", type=int, default=64, help="CPU requests in progress before 503")
+    parser.add_argument("--chunk-size", type=int, default=16, help="boards per worker job")
+    parser.add_argument("--solution-cache", type=int, default=0, help="solved puzzles kept per worker")
+    parser.add_argument("--load-test", type=int, default=0, metavar="N",
+                        help="serve on a free port, send N requests to it and print the results")
+    parser.add_argument("--concurrency", type=int, default=16, help="connections used by --load-test")
+    parser.add_argument("--path", default="/generate?difficulty=easy", help="request target for --load-test")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds to let the cache fill before --load-test")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
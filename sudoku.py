@@ -0,0 +1,786 @@
+import math
+import time
+import pygame
+import text_cache
+from assets import AssetManager
+from compact_board import CompactBoard
+from grader import Hint, next_hint
+from metrics import metrics_from_env
+from move_journal import MoveJournal, load_game, pack_delta, save_game, unpack_delta
+from puzzle_producer import PuzzleProducer
+from sudoku_generator import DIFFICULTY_REMOVED, is_unique, load_puzzle
+
+"""
+The pygame user interface: Cell, Board and the game loop in main().
+Puzzle generation and validation live in sudoku_generator.py, which does not depend on pygame.
+
+"""
+
+
+# text colors used by Cell.draw, preloaded into text_cache by main()
+GENERATED_COLOR = (54, 54, 54)
+PLAYER_COLOR = (255, 117, 117)
+SKETCH_COLOR = (128, 128, 128)
+
+
+class Cell:
+    def __init__(self, value, row, col, screen, cell_size=60, is_generated=False, box_length=3):
+
+        self.value = value
+        self.row = row
+        self.col = col
+        self.sketched_value = 0
+        self.screen = screen
+        self.cell_size = cell_size
+        self.selected = False
+        self.is_generated = is_generated
+        self.box_length = box_length
+        # candidate bitmask shown as small digits in an empty cell (bit n set means n); 0 shows nothing
+        self.notes = 0
+        # set whenever what the cell shows changes, cleared by Board.draw / Board.draw_dirty
+        self.dirty = True
+
+    def set_cell_value(self, value):
+        if not self.is_generated and value != self.value:
+            self.value = value
+            self.dirty = True
+
+    def set_sketched_value(self, value):
+        if not self.is_generated and value != self.sketched_value:
+            self.sketched_value = value
+            self.dirty = True
+
+    def set_notes(self, notes):
+        if notes != self.notes:
+            self.notes = notes
+            self.dirty = True
+
+    def select(self, selected=True):
+        if selected != self.selected:
+            self.selected = selected
+            self.dirty = True
+
+    def get_rect(self):
+        return pygame.Rect(self.row * self.cell_size, self.col * self.cell_size, self.cell_size, self.cell_size)
+
+    def draw(self):
+
+        x = self.row * self.cell_size
+        y = self.col * self.cell_size
+
+        # Draw the cell border
+        border_color = (255, 0, 0) if self.selected else (0, 0, 0)
+        pygame.draw.rect(self.screen, border_color, (x, y, self.cell_size, self.cell_size), 2)
+        if self.value != 0:
+            textColor = PLAYER_COLOR
+            if self.is_generated:
+                textColor = GENERATED_COLOR
+            text = text_cache.render_text(self.value, textColor, self.cell_size)
+            if self.value < 10:
+                self.screen.blit(text, (-4 + x + self.cell_size // 3, -5 + y + self.cell_size // 3))
+            else:
+                # two digit values on 16x16 and larger boards are centered instead
+                self.screen.blit(text, text.get_rect(center=self.get_rect().center))
+        elif self.sketched_value != 0:
+
+            text = text_cache.render_text(self.sketched_value, SKETCH_COLOR, self.cell_size)
+            if self.sketched_value < 10:
+                self.screen.blit(text, (x + self.cell_size // 3, y + self.cell_size // 3))
+            else:
+                self.screen.blit(text, text.get_rect(center=self.get_rect().center))
+        elif self.notes:
+            # candidates in a box_length x box_length mini grid, value n in slot n - 1
+            per_row = self.box_length
+            slot = self.cell_size // per_row
+            value = 0
+            notes = self.notes
+            while notes:
+                notes >>= 1
+                value += 1
+                if notes & 1:
+                    text = text_cache.render_text(value, SKETCH_COLOR, slot)
+                    slot_row, slot_col = divmod(value - 1, per_row)
+                    center = (x + slot_col * slot + slot // 2 + 1, y + slot_row * slot + slot // 2 + 1)
+                    self.screen.blit(text, text.get_rect(center=center))
+
+class Board():
+    """
+    Represents the entire Sudoku board, which is a 9x9 grid made of Cell objects.
+    sudoku_board can be a 2D list of ints or a CompactBoard.
+    Any perfect-square size works (4x4, 16x16, 25x25, ...); cell_size sets the size of each cell in pixels.
+
+    The board keeps the number of filled cells, how often each value appears in every row, column
+    and box, and the set of cells that clash with another cell. These are updated by every value change
+    (place_number, clear, reset_to_original), so is_full, check_board and get_conflicts never scan the grid.
+    It also keeps a candidate bitmask for every cell (bit n set when n does not appear in the cell's row,
+    column or box); a value change only recomputes the masks of the cell and its peers. With auto_notes
+    on, the masks are shown in the empty cells as small digits.
+
+    Every move is recorded in self.journal (a move_journal.MoveJournal) as per-cell deltas, which undo, redo
+    and goto replay onto the cells. save() encodes the game as a small binary blob and Board.restore rebuilds it.
+    """""
+
+    def __init__(self, width, height, screen, difficulty, sudoku_board, cell_size=60):
+        self.width = width
+        self.height = height
+        self.screen = screen
+        self.difficulty = difficulty
+        self.cell_size = cell_size
+        self.grid = [
+            [
+                Cell(
+                    value=sudoku_board[row][col],
+                    row=row,
+                    col=col,
+                    screen=screen,
+                    cell_size=cell_size,
+                    is_generated=(sudoku_board[row][col] != 0),
+                    box_length=math.isqrt(width),
+                )
+                for col in range(width)
+            ]
+            for row in range(height)
+        ]
+        self.selected_cell = None
+        self.journal = MoveJournal()
+
+        self.box_length = math.isqrt(width)
+        self.filled = 0
+        self.row_counts = [[0] * (width + 1) for _ in range(height)]
+        self.col_counts = [[0] * (width + 1) for _ in range(width)]
+        self.box_counts = [[0] * (width + 1) for _ in range(width)]
+        self.conflicts = set()
+        # bitmasks of the values present in each row, column and box, and the candidates of every cell
+        self.all_values = ((1 << (width + 1)) - 1) & ~1
+        self.row_used = [0] * height
+        self.col_used = [0] * width
+        self.box_used = [0] * width
+        self.candidates = [0] * (width * height)
+        self.auto_notes = False
+        for row in range(height):
+            for col in range(width):
+                value = self.grid[row][col].value
+                if value != 0:
+                    self._count(row, col, value, 1)
+        for row in range(height):
+            for col in range(width):
+                self._update_cell(row, col)
+
+    def _count(self, row, col, value, delta):
+        self.filled += delta
+        box = (row // self.box_length) * self.box_length + col // self.box_length
+        self.row_counts[row][value] += delta
+        self.col_counts[col][value] += delta
+        self.box_counts[box][value] += delta
+        bit = 1 << value
+        for counts, used, index in ((self.row_counts, self.row_used, row), (self.col_counts, self.col_used, col),
+                                    (self.box_counts, self.box_used, box)):
+            if counts[index][value]:
+                used[index] |= bit
+            else:
+                used[index] &= ~bit
+
+    def _update_conflict(self, row, col):
+        value = self.grid[row][col].value
+        box = (row // self.box_length) * self.box_length + col // self.box_length
+        if value != 0 and (self.row_counts[row][value] > 1 or self.col_counts[col][value] > 1
+                           or self.box_counts[box][value] > 1):
+            self.conflicts.add((row, col))
+        else:
+            self.conflicts.discard((row, col))
+
+    def _update_cell(self, row, col):
+        """
+        Re-checks whether a cell is in conflict and recomputes its candidate mask.
+        """""
+        self._update_conflict(row, col)
+        cell = self.grid[row][col]
+        if cell.value != 0:
+            mask = 0
+        else:
+            box = (row // self.box_length) * self.box_length + col // self.box_length
+            mask = self.all_values & ~(self.row_used[row] | self.col_used[col] | self.box_used[box])
+        self.candidates[row * self.width + col] = mask
+        if self.auto_notes:
+            cell.set_notes(mask)
+
+    def _set_value(self, row, col, value):
+        """
+        Changes the value of a cell and updates the counts, conflicts and candidates.
+        - Only the cells sharing a row, column or box with (row, col) are re-checked.
+        """""
+        cell = self.grid[row][col]
+        old = cell.value
+        cell.set_cell_value(value)
+        if cell.value == old:
+            return
+        if old != 0:
+            self._count(row, col, old, -1)
+        if cell.value != 0:
+            self._count(row, col, cell.value, 1)
+
+        box_row = (row // self.box_length) * self.box_length
+        box_col = (col // self.box_length) * self.box_length
+        for i in range(self.width):
+            self._update_cell(row, i)
+        for i in range(self.height):
+            if i != row:
+                self._update_cell(i, col)
+        for r in range(box_row, box_row + self.box_length):
+            for c in range(box_col, box_col + self.box_length):
+                if r != row and c != col:
+                    self._update_cell(r, c)
+
+    def _change(self, row, col, value, sketch):
+        """
+        Sets the value and sketched value of an editable cell.
+        - Returns the journal delta for the change, or None if the cell is generated or nothing changed.
+        """""
+        cell = self.grid[row][col]
+        if cell.is_generated or (cell.value == value and cell.sketched_value == sketch):
+            return None
+        delta = pack_delta(row * self.width + col, cell.value, value, cell.sketched_value, sketch)
+        self._set_value(row, col, value)
+        cell.set_sketched_value(sketch)
+        return delta
+
+    def _replay(self, deltas, forward):
+        """
+        Applies journal deltas to the cells: their new values going forward, their old values in reverse otherwise.
+        """""
+        if not forward:
+            deltas = reversed(deltas)
+        for delta in deltas:
+            index, old, new, old_sketch, new_sketch = unpack_delta(delta)
+            row, col = divmod(index, self.width)
+            if forward:
+                self._set_value(row, col, new)
+                self.grid[row][col].set_sketched_value(new_sketch)
+            else:
+                self._set_value(row, col, old)
+                self.grid[row][col].set_sketched_value(old_sketch)
+
+    def draw_grid(self):
+        """
+        Draws the bold lines between the boxes.
+        - These never change, so main() draws them once into its static layer.
+        """""
+        box_size = self.cell_size * self.box_length
+        grid_width = self.cell_size * self.width
+        grid_height = self.cell_size * self.height
+        for i in range(1, self.box_length):
+            pygame.draw.line(self.screen, "black", (box_size * i, 0), (box_size * i, grid_height),6)
+        for i in range(1, self.box_length):
+            pygame.draw.line(self.screen, "black", (0, box_size * i), (grid_width, box_size * i),6)
+
+    def draw(self):
+        """
+        Draws the Sudoku grid and all the cells on the screen.
+        - Draws the grid outline with bold lines between boxes.
+        - Calls the draw method of each cell to display its value or sketch.
+        """""
+        self.draw_grid()
+
+        for row in self.grid:
+            for cell in row:
+                cell.draw()
+                cell.dirty = False
+
+    def draw_dirty(self, static_layer):
+        """
+        Redraws only the cells whose dirty flag is set.
+        - Each dirty cell's area is first restored from static_layer (background, grid lines, buttons).
+        - Returns the list of rects that changed, for pygame.display.update.
+        """""
+        rects = []
+        for row in self.grid:
+            for cell in row:
+                if cell.dirty:
+                    rect = cell.get_rect()
+                    self.screen.blit(static_layer, rect, rect)
+                    cell.draw()
+                    cell.dirty = False
+                    rects.append(rect)
+        return rects
+
+    def mark_all_dirty(self):
+        """
+        Flags every cell for redrawing, e.g. after something else was drawn over the board.
+        """""
+        for row in self.grid:
+            for cell in row:
+                cell.dirty = True
+
+    def select(self, row, col):
+        """
+        Marks the cell at (row, col) as the currently selected cell.
+        - Highlights the selected cell.
+        """""
+        if self.selected_cell:
+            prev_row, prev_col = self.selected_cell
+            self.grid[prev_row][prev_col].select(False)
+
+        self.selected_cell = (row, col)
+        self.grid[row][col].select()
+
+    def click(self, x, y):
+        """
+        Determines if a click (x, y) is inside the grid.
+        - If so, returns the (row, col) of the clicked cell.
+        - If not, returns None.
+        """""
+        cell_size = self.cell_size
+        grid = (self.width * cell_size, self.height * cell_size)
+        if x < grid[0] and y < grid[1]:
+            row = x // cell_size
+            col = y // cell_size
+            self.select(row, col)
+            return row, col
+        return None
+
+    def clear(self):
+        """
+        Clears the value or sketched value of the selected cell.
+        - Only works on cells the user is allowed to edit.
+        """""
+        if self.selected_cell:
+            row, col = self.selected_cell
+            delta = self._change(row, col, 0, 0)
+            if delta is not None:
+                self.journal.record([delta])
+
+    def sketch(self, value):
+        """
+        Sets a sketched value in the top-left corner of the selected cell.
+        - Sketched values are temporary and can be changed later.
+        """""
+        if self.selected_cell:
+            row, col = self.selected_cell
+            delta = self._change(row, col, self.grid[row][col].value, value)
+            if delta is not None:
+                self.journal.record([delta])
+
+    def place_number(self, value):
+        """
+        Sets the final value of the selected cell.
+        - The sketched value is cleared after the final value is placed.
+        """""
+        if self.selected_cell:
+            row, col = self.selected_cell
+            delta = self._change(row, col, value, 0)
+            if delta is not None:
+                self.journal.record([delta])
+
+    def reset_to_original(self, original_board):
+        """
+        Resets the board to its original state.
+        - Clears all user-filled cells, keeping only the initial values.
+        - The reset is a single journal step, so it can be undone.
+        """""
+        deltas = []
+        for row in range(len(self.grid)):
+            for col in range(len(self.grid[row])):
+                delta = self._change(row, col, original_board[row][col], 0)
+                if delta is not None:
+                    deltas.append(delta)
+                self.grid[row][col].select(False)
+        self.journal.record(deltas)
+
+    def undo(self):
+        """
+        Reverts the last move; returns False if there was nothing to undo.
+        """""
+        deltas = self.journal.undo()
+        if deltas is None:
+            return False
+        self._replay(deltas, forward=False)
+        return True
+
+    def redo(self):
+        """
+        Reapplies the last undone move; returns False if there was nothing to redo.
+        """""
+        deltas = self.journal.redo()
+        if deltas is None:
+            return False
+        self._replay(deltas, forward=True)
+        return True
+
+    def goto(self, position):
+        """
+        Moves through the history until position moves are applied (0 is the starting puzzle).
+        """""
+        position = max(0, min(position, len(self.journal)))
+        while self.journal.position > position:
+            self.undo()
+        while self.journal.position < position:
+            self.redo()
+
+    def save(self):
+        """
+        Encodes the game (starting puzzle, difficulty and the whole move history) as bytes for Board.restore.
+        """""
+        givens = [[cell.value if cell.is_generated else 0 for cell in row] for row in self.grid]
+        return save_game(givens, self.journal, self.difficulty)
+
+    @classmethod
+    def restore(cls, data, screen, cell_size=60):
+        """
+        Rebuilds a Board from the bytes returned by save(), at the same point in its history.
+        """""
+        givens, journal, difficulty = load_game(data)
+        board = cls(givens.size, givens.size, screen, difficulty, givens, cell_size)
+        position = journal.position
+        journal.position = 0
+        board.journal = journal
+        board.goto(position)
+        return board
+
+    def get_candidates(self, row, col):
+        """
+        Returns the values that can still go in (row, col), smallest first; empty for a filled cell.
+        """""
+        mask = self.candidates[row * self.width + col]
+        return [value for value in range(1, self.width + 1) if mask >> value & 1]
+
+    def set_auto_notes(self, enabled):
+        """
+        Turns auto-notes on or off: every empty cell shows its candidates as small digits.
+        """""
+        self.auto_notes = enabled
+        for row in range(self.height):
+            for col in range(self.width):
+                self.grid[row][col].set_notes(self.candidates[row * self.width + col] if enabled else 0)
+
+    def hint(self):
+        """
+        Finds the next logical deduction with grader.next_hint.
+        - Returns a grader.Hint(technique, row, col, value), or None if logic alone cannot continue.
+        - If the board has conflicts the hint points at one of them instead, with technique "conflict",
+          preferring a cell the player can edit over a generated one.
+        - The grader starts from the board's candidate masks rather than working them out again.
+        """""
+        if self.conflicts:
+            editable = [(row, col) for row, col in self.conflicts if not self.grid[row][col].is_generated]
+            row, col = min(editable or self.conflicts)
+            return Hint("conflict", row, col, self.grid[row][col].value)
+        return next_hint(self.update_board(), self.candidates)
+
+    def is_full(self):
+        """
+        Checks if the board is completely filled (no empty cells).
+        - Returns True if full, False otherwise.
+        """""
+        return self.filled == self.width * self.height
+
+    def update_board(self, compact=False):
+        """
+        Updates the 2D grid based on the current values of all Cell objects.
+        - Returns a CompactBoard instead of a 2D list if compact is True.
+        """""
+        if compact:
+            return CompactBoard.from_rows([[cell.value for cell in row] for row in self.grid])
+        return [[cell.value for cell in row] for row in self.grid]
+
+    def find_empty(self):
+        """"
+        Finds an empty cell on the board.
+        - Returns the (row, col) of the first empty cell found.
+        - If no empty cells remain, returns None.
+        """""
+        for i in range(self.height):
+            for j in range(self.width):
+                if self.grid[i][j].value == 0:
+                    return (i, j)
+        return None
+
+    def check_board(self):
+        """"
+        Checks if the current state of the board satisfies the Sudoku rules:
+        - Each row contains unique values.
+        - Each column contains unique values.
+        - Each box contains unique values.
+
+        Returns True if no two filled cells clash, False otherwise.
+        Empty cells are ignored, so this is only a full check together with is_full.
+        """""
+        return not self.conflicts
+
+    def is_solved(self):
+        """
+        Checks if every cell is filled and no two cells clash.
+        """""
+        return self.is_full() and not self.conflicts
+
+    def get_conflicts(self):
+        """
+        Returns the set of (row, col) cells whose value also appears elsewhere in their row, column or box.
+        - The set is kept up to date by the board; callers should not modify it.
+        """""
+        return self.conflicts
+
+    # Helper function to check uniqueness, excluding zeros (empty cells)
+    def is_unique(self, values):
+        return is_unique(values)
+
+# game states for main()
+START, PLAYING, WON, LOST = "start", "playing", "won", "lost"
+
+# how long main() sleeps in pygame.event.wait when nothing happens, in milliseconds; nothing on screen
+# animates, so this only bounds how late the periodic metrics log can be
+IDLE_TIMEOUT = 1000
+
+
+'''
+Draws the start screen with its difficulty buttons
+
+Parameters:
+screen is the display surface
+assets is the AssetManager
+buttons maps each difficulty name to its pygame.Rect
+
+Return: None
+'''
+
+
+def draw_start_screen(screen, assets, buttons):
+    screen_width, screen_height = screen.get_size()
+    screen.fill((71, 78, 79))
+    title_text = text_cache.render_text("Sudoku Game", "black", 80)
+    title_rect = title_text.get_rect(center=(screen_width // 2, screen_height // 3))
+    screen.blit(title_text, title_rect)
+
+    for difficulty, button in buttons.items():
+        pygame.draw.rect(screen, "black", button)
+        text = text_cache.render_text(difficulty.capitalize(), "white", 50)
+        screen.blit(text, text.get_rect(center=button.center))
+
+    b = assets.get("start_background")
+    screen.blit(b,b.get_rect(topleft=(0, 0)))
+
+
+'''
+Draws everything that never changes during a game (background, grid lines, buttons)
+After this only dirty cells are redrawn over the returned copy and pushed to the display
+
+Parameters:
+screen is the display surface
+assets is the AssetManager
+board is the Board being played
+buttons is a list of (label, pygame.Rect)
+
+Return: pygame.Surface (the static layer)
+'''
+
+
+def draw_game_screen(screen, assets, board, buttons):
+    screen.fill((237, 245, 255))
+    s = assets.get("game_background")
+    screen.blit(s,s.get_rect(topleft=(0, 0)))
+    board.draw_grid()
+
+    for label, button in buttons:
+        pygame.draw.rect(screen, "black", button)
+        text = text_cache.render_text(label, "white", 40, antialias=False)
+        screen.blit(text, text.get_rect(center=button.center))
+    return screen.copy()
+
+
+'''
+Draws the won or lost screen with its single button (Exit when won, Restart when lost)
+
+Parameters:
+screen is the display surface
+won is a boolean
+button is the pygame.Rect of the button
+
+Return: None
+'''
+
+
+def draw_end_screen(screen, won, button):
+    screen_width, screen_height = screen.get_size()
+    title_text = text_cache.render_text("Game Won!" if won else "Game Over :(", "black", 80)
+    title_rect = title_text.get_rect(center=(screen_width // 2, screen_height // 3))
+    screen.fill("light blue")
+    screen.blit(title_text, title_rect)
+
+    pygame.draw.rect(screen, "black", button)
+    text = text_cache.render_text("Exit" if won else "Restart", "white", 40, antialias=False)
+    screen.blit(text, text.get_rect(center=button.center))
+
+
+'''
+Applies one key press to the board
+
+Parameters:
+board is the Board being played
+event is a pygame KEYDOWN event
+
+Return: None
+'''
+
+
+def handle_key(board, event):
+    if event.key == pygame.K_BACKSPACE:
+        board.place_number(0)
+    if event.key == pygame.K_h:
+        hint = board.hint()
+        if hint is not None:
+            board.select(hint.row, hint.col)
+            if hint.technique != "conflict":
+                board.sketch(hint.value)
+    if event.key == pygame.K_n:
+        board.set_auto_notes(not board.auto_notes)
+    if event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL:
+        board.undo()
+    if event.key == pygame.K_y and event.mod & pygame.KMOD_CTRL:
+        board.redo()
+    if event.key in range(pygame.K_1, pygame.K_9 + 1):
+        num = event.key - pygame.K_0
+        if board.selected_cell:
+            board.place_number(num)
+
+
+'''
+Runs the game as a state machine: START -> PLAYING -> WON or LOST, and back to START on Restart
+The loop sleeps in pygame.event.wait until something happens and only redraws what an event changed,
+so an idle game uses no CPU. Restart just switches back to START, so nothing builds up across games.
+
+Parameters:
+producer is a PuzzleProducer or None to create one (and shut it down on exit)
+metrics is a metrics.Metrics or None; if None, SUDOKU_METRICS is checked
+
+Return: None
+'''
+
+
+def main(producer=None, metrics=None):
+    owns_producer = producer is None
+    if owns_producer:
+        producer = PuzzleProducer(DIFFICULTY_REMOVED, load_puzzle)
+    if metrics is None:
+        metrics = metrics_from_env()
+    try:
+        pygame.init()
+        scale = 0.75
+        screen_width, screen_height = 720*scale, 800*scale
+        screen = pygame.display.set_mode((screen_width, screen_height))
+        assets = AssetManager()
+        assets.load_all()
+        print(assets.report())
+        text_cache.preload_digits([GENERATED_COLOR, PLAYER_COLOR, SKETCH_COLOR], 60)
+
+        difficulty_buttons = {
+            "easy": pygame.Rect(screen_width // 3, screen_height // 2, screen_width // 3, 50),
+            "medium": pygame.Rect(screen_width // 3, screen_height // 2 + 100, screen_width // 3, 50),
+            "hard": pygame.Rect(screen_width // 3, screen_height // 2 + 200, screen_width // 3, 50),
+        }
+        restart_button = pygame.Rect(50*scale, 740*scale, 180*scale, 40*scale)
+        reset_button = pygame.Rect(270*scale, 740*scale, 180*scale, 40*scale)
+        exit_button = pygame.Rect(490*scale, 740*scale, 180*scale, 40*scale)
+        end_button = pygame.Rect(screen_width // 3, screen_height // 1.5, 200 * scale, 50 * scale)
+
+        state = START
+        board = original_board = static_layer = None
+        draw_start_screen(screen, assets, difficulty_buttons)
+        pygame.display.flip()
+
+        running = True
+        while running:
+            event = pygame.event.wait(IDLE_TIMEOUT)
+            if event.type == pygame.NOEVENT:
+                if metrics is not None:
+                    metrics.maybe_log()
+                continue
+            if metrics is not None:
+                frame_start = time.perf_counter()
+            events = [event] + pygame.event.get()
+
+            # what the events lead to: a new state to draw in full, or only dirty cells
+            next_state = state
+            changed = False
+            for event in events:
+                if event.type == pygame.QUIT:
+                    running = False
+                elif next_state == START:
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        for difficulty, button in difficulty_buttons.items():
+                            if button.collidepoint(event.pos):
+                                print(difficulty)
+                                original_board = producer.take(difficulty)
+                                board = Board(width=9, height=9, screen=screen, difficulty=difficulty,
+                                              sudoku_board=original_board)
+                                static_layer = draw_game_screen(screen, assets, board, [
+                                    ("Restart", restart_button), ("Reset", reset_button), ("Exit", exit_button)])
+                                next_state = PLAYING
+                                break
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if next_state == PLAYING and restart_button.collidepoint(event.pos) or \
+                            next_state == LOST and end_button.collidepoint(event.pos):
+                        print("restart button")
+                        next_state = START
+                        break
+                    elif next_state == PLAYING and reset_button.collidepoint(event.pos):
+                        board.reset_to_original(original_board)
+                        changed = True
+                        print("reset button")
+                    elif next_state == PLAYING and exit_button.collidepoint(event.pos) or \
+                            next_state == WON and end_button.collidepoint(event.pos):
+                        running = False
+                        print("exit button")
+                    # the board only takes input while playing; on the end screens it is read-only
+                    if next_state == PLAYING:
+                        board.click(event.pos[0], event.pos[1])
+                elif event.type == pygame.KEYDOWN and next_state == PLAYING:
+                    changed = True
+                    handle_key(board, event)
+
+            if metrics is not None:
+                events_done = time.perf_counter()
+                metrics.add_time("frame_events", events_done - frame_start)
+
+            # the won/lost check only runs after something that can change a value, which only happens while playing
+            if changed and next_state == PLAYING:
+                if not board.is_full():
+                    next_state = PLAYING
+                elif board.check_board():
+                    next_state = WON
+                else:
+                    next_state = LOST
+
+            if next_state != state:
+                # switching states repaints the whole window once
+                state = next_state
+                if state == START:
+                    board = original_board = static_layer = None
+                    draw_start_screen(screen, assets, difficulty_buttons)
+                elif state == PLAYING:
+                    screen.blit(static_layer, (0, 0))
+                    board.draw()
+                else:
+                    draw_end_screen(screen, state == WON, end_button)
+                pygame.display.flip()
+            elif state == PLAYING:
+                rects = board.draw_dirty(static_layer)
+                if metrics is not None:
+                    draw_done = time.perf_counter()
+                    metrics.add_time("frame_draw", draw_done - events_done)
+                if rects:
+                    pygame.display.update(rects)
+                if metrics is not None:
+                    metrics.add_time("frame_display_update", time.perf_counter() - draw_done)
+            if metrics is not None:
+                metrics.maybe_log()
+
+    finally:
+        if owns_producer:
+            producer.shutdown()
+        if metrics is not None:
+            print(metrics.log_line())
+        text_cache.clear()
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
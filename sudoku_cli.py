@@ -0,0 +1,279 @@
+"""
+Command-line tool for streaming puzzles in and out in standard text formats.
+
+    python sudoku_cli.py generate --count 1000 --removed 40 --solutions --format jsonl > puzzles.jsonl
+    python sudoku_cli.py solve --format jsonl puzzles.jsonl
+    python sudoku_cli.py validate --format line puzzles.txt
+
+Formats (one puzzle per line):
+    line  - 81 characters, digits with "." for an empty cell ("0" is also accepted on input),
+            followed by the solution and then any other fields, separated by spaces. Only for boards up to 9x9.
+    jsonl - one JSON object per line: {"puzzle": [[...], ...], "solution": [[...], ...], "seed": ...}
+    csv   - a header row, then puzzle,solution,... with boards written as in the line format
+
+Everything is processed one record at a time through generators, with buffered output, so memory use
+does not depend on --count or the size of the input.
+
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import sys
+
+from batch_generator import generate_many, puzzle_seed
+from dlx_solver import count_solutions, solve
+from sudoku_generator import check_board
+
+FORMATS = ("line", "jsonl", "csv")
+BUFFER_SIZE = 1 << 20
+
+
+class OutputFormatError(ValueError):
+    """
+    Raised by RecordWriter for a record that cannot be written in the chosen output format.
+    """""
+
+
+'''
+Converts a board to a single string, row by row, with "." for empty cells
+
+Parameters:
+board is a 2D list of ints (values up to 9)
+
+Return: str
+'''
+
+
+def board_to_line(board):
+    return "".join(str(value) if value else "." for row in board for value in row)
+
+
+'''
+Parses a string from board_to_line back into a board
+Raises ValueError unless the length is the square of a perfect-square size up to 9 and every digit is at
+most that size
+
+Parameters:
+text is a string of size*size characters, "." or "0" for empty cells
+
+Return: list[list]
+'''
+
+
+def line_to_board(text):
+    size = math.isqrt(len(text))
+    if not text or size * size != len(text) or size > 9 or math.isqrt(size) ** 2 != size:
+        raise ValueError(f"not a board line: {text[:90]!r}")
+    if not set(text) <= set(".0" + "123456789"[:size]):
+        raise ValueError(f"not a {size}x{size} board line, values must be . or 0 to {size}: {text[:90]!r}")
+    values = [0 if char in ".0" else int(char) for char in text]
+    return [values[row * size:(row + 1) * size] for row in range(size)]
+
+
+'''
+Checks that a board read from jsonl is a square list of lists of ints, with a perfect-square size and
+every value between 0 and size
+
+Parameters:
+board is the decoded JSON value
+
+Return: list[list] (the same board)
+'''
+
+
+def check_values(board):
+    size = len(board) if isinstance(board, list) else 0
+    if not size or math.isqrt(size) ** 2 != size:
+        raise ValueError("a board must be a list of rows with a perfect-square length")
+    for row in board:
+        if not isinstance(row, list) or len(row) != size \
+                or any(type(value) is not int or not 0 <= value <= size for value in row):
+            raise ValueError(f"every row must be a list of {size} ints between 0 and {size}")
+    return board
+
+
+'''
+Reads boards from a text stream in the given format, one at a time
+Raises ValueError on a record that is not a board in that format, e.g. when the input is in another format
+
+Parameters:
+stream is a text file object
+fmt is one of FORMATS
+
+Return: iterator of list[list]
+'''
+
+
+def read_boards(stream, fmt):
+    if fmt == "line":
+        for text in stream:
+            fields = text.split()
+            if fields:
+                yield line_to_board(fields[0])
+    elif fmt == "jsonl":
+        for text in stream:
+            if text.strip():
+                try:
+                    record = json.loads(text)
+                except ValueError:
+                    raise ValueError(f"not a JSON line: {text.strip()[:80]!r}") from None
+                if not isinstance(record, dict) or "puzzle" not in record:
+                    raise ValueError(f"no \"puzzle\" field in: {text.strip()[:80]!r}")
+                yield check_values(record["puzzle"])
+    else:
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is not None and "puzzle" not in reader.fieldnames:
+            raise ValueError("no puzzle column in the csv header")
+        for record in reader:
+            yield line_to_board(record["puzzle"] or "")
+
+
+class RecordWriter:
+    """
+    Writes records (dicts of field name -> value) in one of FORMATS.
+    Board fields are written as strings in the line and csv formats and as nested lists in jsonl.
+    The line and csv formats have one character per cell, so boards larger than 9x9 raise OutputFormatError.
+    """""
+
+    def __init__(self, stream, fmt, fields):
+        self.stream = stream
+        self.fmt = fmt
+        self.fields = fields
+        self.csv = None
+        if fmt == "csv":
+            self.csv = csv.writer(stream, lineterminator="\n")
+            self.csv.writerow(fields)
+
+    def write(self, record):
+        if self.fmt == "jsonl":
+            self.stream.write(json.dumps(record, separators=(",", ":")))
+            self.stream.write("\n")
+            return
+        values = [record.get(field) for field in self.fields]
+        for value in values:
+            if isinstance(value, list) and len(value) > 9:
+                raise OutputFormatError(f"{len(value)}x{len(value)} boards can only be written as jsonl, "
+                                        f"not {self.fmt}")
+        row = [board_to_line(value) if isinstance(value, list) else _text(value) for value in values]
+        if self.csv is not None:
+            self.csv.writerow(row)
+        else:
+            self.stream.write(" ".join(row))
+            self.stream.write("\n")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def generate_records(args):
+    seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(64)
+    boards = generate_many(args.count, args.removed, workers=args.workers, size=args.size,
+                           unique=args.unique, seed=seed, solutions=args.solutions, max_attempts=args.max_attempts)
+    for index, board in enumerate(boards):
+        if args.solutions:
+            board, solution = board
+            record = {"puzzle": board, "solution": solution}
+        else:
+            record = {"puzzle": board}
+        record["seed"] = puzzle_seed(seed, index)
+        yield record
+
+
+def solve_records(boards):
+    for board in boards:
+        yield {"puzzle": board, "solution": solve(board)}
+
+
+def validate_records(boards):
+    for board in boards:
+        valid = check_board(board)
+        yield {
+            "puzzle": board,
+            "valid": valid,
+            "solved": valid and all(all(row) for row in board),
+            "solutions": count_solutions(board, 2) if valid else 0,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream sudoku puzzles in text formats")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="generate puzzles")
+    generate.add_argument("--count", type=int, default=1)
+    generate.add_argument("--removed", type=int, default=40)
+    generate.add_argument("--size", type=int, default=9)
+    generate.add_argument("--seed", type=int, default=None)
+    generate.add_argument("--workers", type=int, default=1)
+    generate.add_argument("--unique", action="store_true", help="only remove cells that keep one solution")
+    generate.add_argument("--max-attempts", type=int, default=None,
+                          help="most uniqueness checks per puzzle with --unique (default: one per cell removed)")
+    generate.add_argument("--solutions", action="store_true", help="also write each puzzle's solution")
+
+    for name, help_text in (("solve", "solve puzzles"), ("validate", "check puzzles against the rules")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("input", nargs="?", default="-", help="input file (default: stdin)")
+        command.add_argument("--input-format", choices=FORMATS, default=None,
+                             help="format of the input (default: same as --format)")
+
+    for command in commands.choices.values():
+        command.add_argument("--format", choices=FORMATS, default="line")
+        command.add_argument("--output", default="-", help="output file (default: stdout)")
+
+    args = parser.parse_args(argv)
+    if args.command == "generate" and args.size > 9 and args.format != "jsonl":
+        parser.error("boards larger than 9x9 can only be written as jsonl")
+
+    if args.output == "-":
+        output = open(sys.stdout.fileno(), "w", buffering=BUFFER_SIZE, closefd=False)
+    else:
+        output = open(args.output, "w", buffering=BUFFER_SIZE, newline="")
+    closers = [output.close]
+    try:
+        try:
+            if args.command == "generate":
+                fields = ["puzzle", "solution", "seed"] if args.solutions else ["puzzle", "seed"]
+                records = generate_records(args)
+            else:
+                stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+                boards = read_boards(stream, args.input_format or args.format)
+                if stream is not sys.stdin:
+                    closers.append(stream.close)
+                if args.command == "solve":
+                    fields = ["puzzle", "solution"]
+                    records = solve_records(boards)
+                else:
+                    fields = ["puzzle", "valid", "solved", "solutions"]
+                    records = validate_records(boards)
+            writer = RecordWriter(output, args.format, fields)
+            try:
+                for record in records:
+                    writer.write(record)
+            except OutputFormatError as error:
+                parser.error(str(error))
+            except ValueError as error:
+                if args.command == "generate":
+                    raise
+                parser.error(f"{args.input}: {error} "
+                             f"(is --input-format {args.input_format or args.format} right?)")
+        finally:
+            for close in closers:
+                close()
+    except BrokenPipeError:
+        # the reader went away (e.g. piped into head): point stdout at devnull so the interpreter's own
+        # flush at exit cannot fail again, and stop quietly like other pipe-friendly tools
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+
+
+if __name__ == "__main__":
+    main()
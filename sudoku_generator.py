@@ -1,54 +1,16 @@
-import math, random
-import pygame
-from pygame.examples.moveit import WIDTH, HEIGHT
-# from matplotlib.pyplot import fill_between
+import math, os, random
+from compact_board import CompactBoard
+from dlx_solver import build_matrix, count_solutions
+from puzzle_bank import PuzzleBank, bank_path
 
 """
 This was adapted from a GeeksforGeeks article "Program for Sudoku Generator" by Aarti_Rathi and Ankur Trisal
 https://www.geeksforgeeks.org/program-sudoku-generator/
 
-"""
-
-
-class Cell:
-    def __init__(self, value, row, col, screen, cell_size=60, is_generated=False):
-
-        self.value = value
-        self.row = row
-        self.col = col
-        self.sketched_value = 0
-        self.screen = screen
-        self.cell_size = cell_size
-        self.selected = False
-        self.is_generated = is_generated
-
-    def set_cell_value(self, value):
-        if not self.is_generated:
-            self.value = value
-
-    def set_sketched_value(self, value):
-        if not self.is_generated:
-            self.sketched_value = value
-
-    def draw(self):
+This module is the pure-Python puzzle core (generation and validation) and must not import pygame,
+so batch workers and services can use it without starting the pygame runtime. The game lives in sudoku.py.
 
-        x = self.row * self.cell_size
-        y = self.col * self.cell_size
-
-        # Draw the cell border
-        border_color = (255, 0, 0) if self.selected else (0, 0, 0)
-        pygame.draw.rect(self.screen, border_color, (x, y, self.cell_size, self.cell_size), 2)
-        font = pygame.font.Font(None, 60)
-        if self.value != 0:
-            textColor = (255, 117, 117)
-            if self.is_generated:
-                textColor = (54, 54, 54)
-            text = font.render(str(self.value), True, textColor)
-            self.screen.blit(text, (-4 + x + self.cell_size // 3, -5 + y + self.cell_size // 3))
-        elif self.sketched_value != 0:
-
-            text = font.render(str(self.sketched_value), True, (128, 128, 128))
-            self.screen.blit(text, (x + self.cell_size // 3, y + self.cell_size // 3))
+"""
 
 
 class SudokuGenerator:
@@ -59,24 +21,44 @@ class SudokuGenerator:
 	self.removed_cells	- the total number of cells to be removed
 	self.board			- a 2D list of ints to represent the board
 	self.box_length		- the square root of row_length
+	self.unique			- whether remove_cells must keep the puzzle to exactly one solution
+	self.max_attempts	- the most uniqueness checks remove_cells may run when unique is set
+	self.rng			- the random.Random used for every random choice, so a seed always gives the same board
+	self.mrv			- whether fill_remaining fills the cell with the fewest candidates first
 
 	Parameters:
-    row_length is the number of rows/columns of the board (always 9 for this project)
+    row_length is the number of rows/columns of the board - any perfect square (4, 9, 16, 25, ...)
     removed_cells is an integer value - the number of cells to be removed
+    unique is a boolean - opt in to uniqueness-preserving removal (default False)
+    max_attempts is an integer value or None - the attempt budget for unique removal (default: one per cell
+    to remove; each attempt can remove two cells, so this leaves room for as many retries as removals)
+    seed is an int, a random.Random instance or None - where random choices come from (default: a fresh unseeded Random)
+    mrv is a boolean - fill_remaining picks the most constrained cell first (default False, which keeps
+    the boards for a given seed unchanged); other sizes always search most constrained first (see fill_randomized)
 
 	Return:
 	None
     """""
 
-    def __init__(self, row_length, removed_cells):
+    def __init__(self, row_length, removed_cells, unique=False, max_attempts=None, seed=None, mrv=False):
         self.row_length = row_length
         self.removed_cells = removed_cells
-        self.box_length = int(row_length ** 0.5)
+        self.box_length = math.isqrt(row_length)
+        if self.box_length * self.box_length != row_length:
+            raise ValueError(f"row_length {row_length} is not a perfect square")
+        self.unique = unique
+        self.max_attempts = max_attempts if max_attempts is not None else removed_cells
+        self.rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+        self.mrv = mrv
         self.board = []
         for i in range(row_length):
             self.board.append([])
             for j in range(row_length):
-                self.board[i].append("_")
+                self.board[i].append(0)
+        # occupancy bitmasks: bit n is set when num n is already used in that row/col/box
+        self.row_masks = [0] * row_length
+        self.col_masks = [0] * row_length
+        self.box_masks = [0] * row_length
 
     '''
 	Returns a 2D python list of numbers which represents the board
@@ -92,6 +74,55 @@ class SudokuGenerator:
         for row in self.board:
             print(" ".join(str(cell) if cell != 0 else "." for cell in row))
 
+    '''
+    Returns the index of the box containing (row, col), counting boxes left to right, top to bottom
+
+	Parameters:
+	row and col are the row index and col index of a cell in the board
+
+	Return: int
+    '''
+
+    def box_index(self, row, col):
+        return (row // self.box_length) * self.box_length + col // self.box_length
+
+    '''
+    Writes num into (row, col) and marks it as used in the row, column and box masks
+    The cell must be empty when this is called
+
+	Parameters:
+	row and col are the row index and col index of the cell to set
+	num is the value to enter in this cell
+
+	Return: None
+    '''
+
+    def set_value(self, row, col, num):
+        bit = 1 << num
+        self.board[row][col] = num
+        self.row_masks[row] |= bit
+        self.col_masks[col] |= bit
+        self.box_masks[self.box_index(row, col)] |= bit
+
+    '''
+    Empties (row, col) by setting it to 0 and releases its value from the row, column and box masks
+
+	Parameters:
+	row and col are the row index and col index of the cell to clear
+
+	Return: None
+    '''
+
+    def clear_value(self, row, col):
+        num = self.board[row][col]
+        if num == 0:
+            return
+        bit = ~(1 << num)
+        self.board[row][col] = 0
+        self.row_masks[row] &= bit
+        self.col_masks[col] &= bit
+        self.box_masks[self.box_index(row, col)] &= bit
+
     '''
 	Determines if num is contained in the specified row (horizontal) of the board
     If num is already in the specified row, return False. Otherwise, return True
@@ -104,7 +135,7 @@ class SudokuGenerator:
     '''
 
     def valid_in_row(self, row, num):
-        return num not in self.board[row]
+        return not self.row_masks[row] & (1 << num)
 
     '''
 	Determines if num is contained in the specified column (vertical) of the board
@@ -118,31 +149,27 @@ class SudokuGenerator:
     '''
 
     def valid_in_col(self, col, num):
-        return num not in [self.board[row][col] for row in range(self.row_length)]
+        return not self.col_masks[col] & (1 << num)
 
     '''
-	Determines if num is contained in the 3x3 box specified on the board
+	Determines if num is contained in the box specified on the board
     If num is in the specified box starting at (row_start, col_start), return False.
     Otherwise, return True
 
 	Parameters:
 	row_start and col_start are the starting indices of the box to check
-	i.e. the box is from (row_start, col_start) to (row_start+2, col_start+2)
+	i.e. the box is from (row_start, col_start) to (row_start+box_length-1, col_start+box_length-1)
 	num is the value we are looking for in the box
 
 	Return: boolean
     '''
 
     def valid_in_box(self, row_start, col_start, num):
-        for row in range(row_start, row_start + 3):
-            for col in range(col_start, col_start + 3):
-                if self.board[row][col] == num:
-                    return False
-        return True
+        return not self.box_masks[self.box_index(row_start, col_start)] & (1 << num)
 
     '''
     Determines if it is valid to enter num at (row, col) in the board
-    This is done by checking that num is unused in the appropriate, row, column, and box
+    This is done with one test of num against the row, column, and box occupancy masks
 
 	Parameters:
 	row and col are the row index and col index of the cell to check in the board
@@ -152,100 +179,178 @@ class SudokuGenerator:
     '''
 
     def is_valid(self, row, col, num):
-        if not self.valid_in_row(row, num):
-            return False
-        if not self.valid_in_col(col, num):
-            return False
-        box_row_start = (row // 3) * 3
-        col_row_start = (col // 3) * 3
-        if not self.valid_in_box(box_row_start, col_row_start, num):
-            return False
-        return True
+        used = self.row_masks[row] | self.col_masks[col] | self.box_masks[self.box_index(row, col)]
+        return not used & (1 << num)
 
     '''
-    Fills the specified 3x3 box with values
-    For each position, generates a random digit which has not yet been used in the box
+    Fills the specified box with values
+    Shuffles the digits 1 to row_length once and deals them out across the box, so no draw is wasted
 
 	Parameters:
 	row_start and col_start are the starting indices of the box to check
-	i.e. the box is from (row_start, col_start) to (row_start+2, col_start+2)
+	i.e. the box is from (row_start, col_start) to (row_start+box_length-1, col_start+box_length-1)
 
 	Return: None
     '''
 
     def fill_box(self, row_start, col_start):
-        for row in range(row_start, row_start + 3):
-            for col in range(col_start, col_start + 3):
-                while self.board[row][col] == '_':
-                    new_num = random.randint(1, 9)
-                    if self.valid_in_box(row_start, col_start, new_num):
-                        self.board[row][col] = new_num
+        nums = list(range(1, self.row_length + 1))
+        self.rng.shuffle(nums)
+        for row in range(row_start, row_start + self.box_length):
+            for col in range(col_start, col_start + self.box_length):
+                self.set_value(row, col, nums.pop())
 
     '''
-    Fills the three boxes along the main diagonal of the board
-    These are the boxes which start at (0,0), (3,3), and (6,6)
+    Fills the boxes along the main diagonal of the board
+    For a 9x9 board these are the boxes which start at (0,0), (3,3), and (6,6)
 
 	Parameters: None
 	Return: None
     '''
 
     def fill_diagonal(self):
-        for i in range(0, 7, 3):
+        for i in range(0, self.row_length, self.box_length):
             self.fill_box(i, i)
 
     '''
-    DO NOT CHANGE
-    Provided for students
     Fills the remaining cells of the board
     Should be called after the diagonal boxes have been filled
+    Every empty cell from (row, col) onwards, in row-major order, is filled by complete_cells
 
 	Parameters:
 	row, col specify the coordinates of the first empty (0) cell
+	mrv is a boolean or None - pick the cell with the fewest candidates first (default: self.mrv)
 
 	Return:
 	boolean (whether or not we could solve the board)
     '''
 
-    def fill_remaining(self, row, col):
-        if (col >= self.row_length and row < self.row_length - 1):
-            row += 1
-            col = 0
-        if row >= self.row_length and col >= self.row_length:
-            return True
-        if row < self.box_length:
-            if col < self.box_length:
-                col = self.box_length
-        elif row < self.row_length - self.box_length:
-            if col == int(row // self.box_length * self.box_length):
-                col += self.box_length
-        else:
-            if col == self.row_length - self.box_length:
-                row += 1
-                col = 0
-                if row >= self.row_length:
-                    return True
-
-        for num in range(1, self.row_length + 1):
-            if self.is_valid(row, col, num):
-                self.board[row][col] = num
-                if self.fill_remaining(row, col + 1):
-                    return True
-                self.board[row][col] = 0
-        return False
-
-    '''
-    DO NOT CHANGE
-    Provided for students
+    def fill_remaining(self, row, col, mrv=None):
+        size = self.row_length
+        board = self.board
+        cells = [(r, c) for r in range(row, size) for c in range(col if r == row else 0, size) if board[r][c] == 0]
+        return self.complete_cells(cells, self.mrv if mrv is None else mrv)
+
+    '''
+    Backtracking search that fills the given empty cells, with an explicit stack instead of recursion
+    Candidates come straight from the occupancy masks and are tried smallest first. Without mrv the cells
+    are filled in the order given, which is the same search (and the same board) as the old recursive
+    fill_remaining. With mrv each step fills the cell with the fewest candidates left instead.
+    Afterwards self.fill_backtracks holds the number of values taken back out, self.fill_max_depth
+    the most cells that were filled at once and self.fill_candidate_tests the number of times a cell's
+    candidates were read from the masks (each one replaces a row of is_valid calls).
+
+	Parameters:
+	cells is a list of (row, col) of empty cells
+	mrv is a boolean - choose the most constrained cell at each step (default False)
+
+	Return:
+	boolean (whether or not every cell could be filled; if not the cells are left empty)
+    '''
+
+    def complete_cells(self, cells, mrv=False):
+        board = self.board
+        row_masks, col_masks, box_masks = self.row_masks, self.col_masks, self.box_masks
+        box_length = self.box_length
+        full = ((1 << (self.row_length + 1)) - 1) & ~1
+        todo = [(row, col, (row // box_length) * box_length + col // box_length) for row, col in cells]
+        # todo[:depth] are the filled cells and untried[i] holds the candidates todo[i] has not tried yet
+        untried = []
+        depth = max_depth = backtracks = tests = 0
+        count = len(todo)
+        while depth < count:
+            if mrv:
+                best, fewest = depth, self.row_length + 1
+                tests += count - depth
+                for index in range(depth, count):
+                    row, col, box = todo[index]
+                    left = bin(full & ~(row_masks[row] | col_masks[col] | box_masks[box])).count("1")
+                    if left < fewest:
+                        best, fewest = index, left
+                        if left <= 1:
+                            break
+                todo[depth], todo[best] = todo[best], todo[depth]
+            row, col, box = todo[depth]
+            candidates = full & ~(row_masks[row] | col_masks[col] | box_masks[box])
+            tests += 1
+            while not candidates:
+                # dead end: take the last value back out and move on to that cell's next candidate
+                if depth == 0:
+                    self.fill_backtracks, self.fill_max_depth, self.fill_candidate_tests = backtracks, max_depth, tests
+                    return False
+                depth -= 1
+                row, col, box = todo[depth]
+                bit = ~(1 << board[row][col])
+                board[row][col] = 0
+                row_masks[row] &= bit
+                col_masks[col] &= bit
+                box_masks[box] &= bit
+                backtracks += 1
+                candidates = untried.pop()
+            bit = candidates & -candidates
+            untried.append(candidates ^ bit)
+            board[row][col] = bit.bit_length() - 1
+            row_masks[row] |= bit
+            col_masks[col] |= bit
+            box_masks[box] |= bit
+            depth += 1
+            if depth > max_depth:
+                max_depth = depth
+        self.fill_backtracks, self.fill_max_depth, self.fill_candidate_tests = backtracks, max_depth, tests
+        return True
+
+    '''
     Constructs a solution by calling fill_diagonal and fill_remaining
+    At 9x9 this is the plain search from the diagonal boxes, so a seed gives the same board as before.
+    Other sizes go through fill_randomized instead, since from 16x16 up that search can run for minutes.
 
 	Parameters: None
 	Return: None
     '''
 
     def fill_values(self):
+        if self.row_length != 9:
+            self.fill_randomized()
+            return
         self.fill_diagonal()
         self.fill_remaining(0, self.box_length)
 
+    '''
+    Constructs a solution with a randomized dancing-links search that restarts when it gets stuck
+    Fills the diagonal boxes, then completes the board with Algorithm X over a matrix whose rows are
+    shuffled, so every choice is tried in random order. The search branches on whichever cell, or row,
+    column or box value, has the fewest options left, so self.mrv makes no difference here. A search that
+    passes its node budget is thrown away and started again from new diagonal boxes with a budget half as
+    large again, which cuts off the heavy-tailed runs (and 4x4 diagonals that cannot be completed at all).
+    Afterwards self.fill_restarts holds the number of searches that were thrown away.
+
+	Parameters:
+	max_nodes is an int - the node budget for the first search (default: three per cell)
+
+	Return: None
+    '''
+
+    def fill_randomized(self, max_nodes=None):
+        size = self.row_length
+        box = self.box_length
+        budget = max_nodes if max_nodes is not None else 3 * size * size
+        restarts = 0
+        while True:
+            self.fill_diagonal()
+            found, rows = build_matrix(self.board, rng=self.rng).search(limit=1, max_nodes=budget)
+            if found:
+                break
+            for start in range(0, size, box):
+                for row in range(start, start + box):
+                    for col in range(start, start + box):
+                        self.clear_value(row, col)
+            restarts += 1
+            budget += budget // 2
+        for row, col, num in rows:
+            if self.board[row][col] == 0:
+                self.set_value(row, col, num)
+        self.fill_restarts = restarts
+
     '''
     Removes the appropriate number of cells from the board
     This is done by setting some values to 0
@@ -255,199 +360,99 @@ class SudokuGenerator:
     NOTE: Be careful not to 'remove' the same cell multiple times
     i.e. if a cell is already 0, it cannot be removed again
 
+    If self.unique is set this defers to remove_cells_unique instead
+    Afterwards self.remove_retries holds the number of random picks that landed on an already empty cell
+
 	Parameters: None
 	Return: None
     '''
 
     def remove_cells(self):
+        if self.unique:
+            self.remove_cells_unique()
+            return
         removed = 0
+        picks = 0
         while removed < self.removed_cells:
-            row = random.randrange(self.row_length)
-            col = random.randrange(self.row_length)
+            row = self.rng.randrange(self.row_length)
+            col = self.rng.randrange(self.row_length)
+            picks += 1
             if self.board[row][col] != 0:
-                self.board[row][col] = 0
+                self.clear_value(row, col)
                 removed += 1
+        self.remove_retries = picks - removed
 
+    '''
+    Removes cells while keeping the puzzle to exactly one solution
+    Cells are visited in random order together with their partner under 180 degree rotation, so the
+    holes come out symmetric. A removal is kept only if count_solutions (stopping at 2) still finds
+    a single solution, otherwise the values are put back.
+    The pair is removed as a single cell when only one more removal is needed or the cell is the center.
 
-class Board():
-    """
-    Represents the entire Sudoku board, which is a 9x9 grid made of Cell objects.
-    """""
+    NOTE: Stops after self.max_attempts uniqueness checks, so fewer than removed_cells cells may be
+    removed when the budget runs out or no further cell can be removed
+    Afterwards self.remove_retries holds the number of removals that had to be put back
 
-    def __init__(self, width, height, screen, difficulty, sudoku_board):
-        self.width = width
-        self.height = height
-        self.screen = screen
-        self.difficulty = difficulty
-        self.grid = [
-            [
-                Cell(
-                    value=sudoku_board[row][col],
-                    row=row,
-                    col=col,
-                    screen=screen,
-                    cell_size=60,
-                    is_generated=(sudoku_board[row][col] != 0),
-                )
-                for col in range(width)
-            ]
-            for row in range(height)
-        ]
-        self.selected_cell = None
-
-    def draw(self):
-        """
-        Draws the Sudoku grid and all the cells on the screen.
-        - Draws the grid outline with bold lines for 3x3 boxes.
-        - Calls the draw method of each cell to display its value or sketch.
-        """""
-        cell_size = 60
-        scale = 0.75
-        for i in range(1, self.width // 3):
-            pygame.draw.line(self.screen, "black", (60 * i * (self.width // 3), 0), (60 * i * (self.width // 3), 720*scale),6)
-        for i in range(1, self.height // 3):
-            pygame.draw.line(self.screen, "black", (0, 60 * i * (self.width // 3)), (720*scale, 60 * i * (self.width // 3)),6)
-
-        for row in self.grid:
-            for cell in row:
-                cell.draw()
-
-    def select(self, row, col):
-        """
-        Marks the cell at (row, col) as the currently selected cell.
-        - Highlights the selected cell.
-        """""
-        if self.selected_cell:
-            prev_row, prev_col = self.selected_cell
-            self.grid[prev_row][prev_col].selected = False
-
-        self.selected_cell = (row, col)
-        self.grid[row][col].selected = True
-
-    def click(self, x, y):
-        """
-        Determines if a click (x, y) is inside the grid.
-        - If so, returns the (row, col) of the clicked cell.
-        - If not, returns None.
-        """""
-        grid = (540, 540)
-        cell_size = grid[0] // 9
-        if x < grid[0] and y < grid[1]:
-            row = x // cell_size
-            col = y // cell_size
-            self.select(row, col)
-            return row, col
-        return None
-
-    def clear(self):
-        """
-        Clears the value or sketched value of the selected cell.
-        - Only works on cells the user is allowed to edit.
-        """""
-        if self.selected_cell:
-            row, col = self.selected_cell
-            if not self.grid[row][col].is_generated:
-                self.grid[row][col].set_cell_value(0)
-                self.grid[row][col].set_sketched_value(0)
-
-    def sketch(self, value):
-        """
-        Sets a sketched value in the top-left corner of the selected cell.
-        - Sketched values are temporary and can be changed later.
-        """""
-        if self.selected_cell:
-            row, col = self.selected_cell
-            self.grid[row][col].set_sketched_value(value)
-
-    def place_number(self, value):
-        """
-        Sets the final value of the selected cell.
-        - The sketched value is cleared after the final value is placed.
-        """""
-        if self.selected_cell:
-            row, col = self.selected_cell
-            if not self.grid[row][col].is_generated:
-                self.grid[row][col].set_cell_value(value)
-                self.grid[row][col].set_sketched_value(0)
-
-    def reset_to_original(self, original_board):
-        """
-        Resets the board to its original state.
-        - Clears all user-filled cells, keeping only the initial values.
-        """""
-        for row in range(len(self.grid)):
-            for col in range(len(self.grid[row])):
-                self.grid[row][col].set_cell_value(original_board[row][col])
-                self.grid[row][col].set_sketched_value(0)
-                self.grid[row][col].selected = False
-
-    def is_full(self):
-        """
-        Checks if the board is completely filled (no empty cells).
-        - Returns True if full, False otherwise.
-        """""
-        for row in self.grid:
-            for cell in row:
-                if cell.value == 0:
-                    return False
-        return True
-
-    def update_board(self):
-        """
-        Updates the 2D grid based on the current values of all Cell objects.
-        """""
-        return [[cell.value for cell in row] for row in self.grid]
-
-    def find_empty(self):
-        """"
-        Finds an empty cell on the board.
-        - Returns the (row, col) of the first empty cell found.
-        - If no empty cells remain, returns None.
-        """""
-        for i in range(9):
-            for j in range(9):
-                if self.grid[i][j].value == 0:
-                    return (i, j)
-        return None
-
-    def check_board(self):
-        """"
-        Checks if the current state of the board satisfies the Sudoku rules:
-        - Each row contains unique values.
-        - Each column contains unique values.
-        - Each 3x3 box contains unique values.
-
-        Returns True if the board is valid and solved, False otherwise.
-        """""
-        # Check all rows
-        for row in range(9):
-            if not self.is_unique([self.grid[row][col].value for col in range(9)]):
-                return False
+	Parameters: None
+	Return: int (the number of cells actually removed)
+    '''
 
-        # Check all columns
-        for col in range(9):
-            if not self.is_unique([self.grid[row][col].value for row in range(9)]):
-                return False
+    def remove_cells_unique(self):
+        last = self.row_length - 1
+        cells = [(row, col) for row in range(self.row_length) for col in range(self.row_length)]
+        self.rng.shuffle(cells)
+        removed = 0
+        attempts = 0
+        retries = 0
+        for row, col in cells:
+            if removed >= self.removed_cells or attempts >= self.max_attempts:
+                break
+            if self.board[row][col] == 0:
+                continue
+            group = [(row, col)]
+            partner = (last - row, last - col)
+            if partner != (row, col) and self.board[partner[0]][partner[1]] != 0 \
+                    and removed + 2 <= self.removed_cells:
+                group.append(partner)
+            saved = [(r, c, self.board[r][c]) for r, c in group]
+            for r, c in group:
+                self.clear_value(r, c)
+            attempts += 1
+            if count_solutions(self.board, 2) == 1:
+                removed += len(group)
+            else:
+                for r, c, num in saved:
+                    self.set_value(r, c, num)
+                retries += 1
+        self.remove_retries = retries
+        return removed
+
+
+class InstrumentedSudokuGenerator(SudokuGenerator):
+    """
+    A SudokuGenerator that reports into a metrics.Metrics object:
+    fill_remaining candidate tests, backtracks (values taken back out) and maximum search depth,
+    and remove_cells retries (see remove_cells).
+    Only used when a Metrics object is passed to generate_sudoku, so the plain generator pays nothing.
+    """""
 
-        # Check all 3x3 boxes
-        for row_start in range(0, 9, 3):
-            for col_start in range(0, 9, 3):
-                box_values = [self.grid[row][col].value for row in range(row_start, row_start + 3) for col in
-                              range(col_start, col_start + 3)]
-                if not self.is_unique(box_values):
-                    return False
+    def __init__(self, *args, metrics, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics
 
-        return True  # Board is valid
+    def complete_cells(self, cells, mrv=False):
+        filled = super().complete_cells(cells, mrv)
+        self.metrics.count("fill_remaining_candidate_tests", self.fill_candidate_tests)
+        self.metrics.count("fill_remaining_backtracks", self.fill_backtracks)
+        self.metrics.record_max("fill_remaining_max_depth", self.fill_max_depth)
+        return filled
 
-    # Helper function to check uniqueness, excluding zeros (empty cells)
-    def is_unique(self, values):
-        numbers = [value for value in values if value != 0]
-        return len(numbers) == len(set(numbers))
+    def remove_cells(self):
+        super().remove_cells()
+        self.metrics.count("remove_cells_retries", self.remove_retries)
 
 
 '''
-DO NOT CHANGE
-Provided for students
 Given a number of rows and number of cells to remove, this function:
 1. creates a SudokuGenerator
 2. fills its values and saves this as the solved state
@@ -455,190 +460,110 @@ Given a number of rows and number of cells to remove, this function:
 4. returns the representative 2D Python Lists of the board and solution
 
 Parameters:
-size is the number of rows/columns of the board (9 for this project)
+size is the number of rows/columns of the board - any perfect square (4, 9, 16, 25, ...)
 removed is the number of cells to clear (set to 0)
-
-Return: list[list] (a 2D Python list to represent the board)
+unique is a boolean - if True only removals that keep exactly one solution are made (default False)
+max_attempts is an int or None - the most uniqueness checks unique removal may run (default: one per cell removed)
+seed is an int, a random.Random instance or None - the same seed always gives the same board (default None)
+compact is a boolean - return a CompactBoard instead of a 2D list (default False)
+mrv is a boolean - fill the most constrained cells first when completing the solution (default False)
+metrics is a metrics.Metrics or None - if given, generator counters are added to it (default None)
+solution is a boolean - also return the solved board the cells were removed from (default False)
+
+Return: list[list] (a 2D Python list to represent the board), or a CompactBoard
+With solution, a tuple (board, solution) of two of these
 '''
 
 
-def generate_sudoku(size, removed):
-    sudoku = SudokuGenerator(size, removed)
+def generate_sudoku(size, removed, unique=False, seed=None, compact=False, mrv=False, metrics=None,
+                    solution=False, max_attempts=None):
+    if metrics is None:
+        sudoku = SudokuGenerator(size, removed, unique=unique, max_attempts=max_attempts, seed=seed, mrv=mrv)
+    else:
+        sudoku = InstrumentedSudokuGenerator(size, removed, unique=unique, max_attempts=max_attempts, seed=seed,
+                                             mrv=mrv, metrics=metrics)
+        metrics.count("boards_generated")
     sudoku.fill_values()
     board = sudoku.get_board()
+    solved = [row[:] for row in board] if solution else None
     sudoku.remove_cells()
     board = sudoku.get_board()
+    if compact:
+        board = CompactBoard.from_rows(board)
+        solved = CompactBoard.from_rows(solved) if solution else None
+    if solution:
+        return board, solved
     return board
 
 
-def main():
-    try:
-        pygame.init()
-        scale = 0.75
-        screen_width, screen_height = 720*scale, 800*scale
-        screen = pygame.display.set_mode((screen_width, screen_height))
-        clock = pygame.time.Clock()
-
-        start_screen = True
-
-        easy_button = pygame.Rect(screen_width // 3, screen_height // 2, screen_width // 3, 50)
-        medium_button = pygame.Rect(screen_width // 3, screen_height // 2 + 100, screen_width // 3, 50)
-        hard_button = pygame.Rect(screen_width // 3, screen_height // 2 + 200, screen_width // 3, 50)
-
-        while start_screen:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    start_screen = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if easy_button.collidepoint(event.pos):
-                        difficulty = "easy"
-                        original_board = generate_sudoku(9, 30)
-                        print("easy")
-                        start_screen = False
-                    elif medium_button.collidepoint(event.pos):
-                        difficulty = "medium"
-                        original_board = generate_sudoku(9,40)
-                        print("medium")
-                        start_screen = False
-                    elif hard_button.collidepoint(event.pos):
-                        difficulty = "hard"
-                        original_board = generate_sudoku(9,50)
-                        print("hard")
-                        start_screen = False
-
-            screen.fill((71, 78, 79))
-            title_font = pygame.font.Font(None, 80)
-            button_font = pygame.font.Font(None, 50)
-
-            title_text = title_font.render("Sudoku Game", True, "black")
-            title_rect = title_text.get_rect(center=(screen_width // 2, screen_height // 3))
-            screen.blit(title_text, title_rect)
-
-            pygame.draw.rect(screen, "black", easy_button)
-            pygame.draw.rect(screen, "black", medium_button)
-            pygame.draw.rect(screen, "black", hard_button)
-
-            easy_text = button_font.render("Easy", True, "white")
-            medium_text = button_font.render("Medium", True, "white")
-            hard_text = button_font.render("Hard", True, "white")
-
-            easy_text_rect = easy_text.get_rect(center=easy_button.center)
-            medium_text_rect = medium_text.get_rect(center=medium_button.center)
-            hard_text_rect = hard_text.get_rect(center=hard_button.center)
-
-            screen.blit(easy_text, easy_text_rect)
-            screen.blit(medium_text, medium_text_rect)
-            screen.blit(hard_text, hard_text_rect)
-
-            b = pygame.image.load("Sudoku Background.png")
-            screen.blit(b,b.get_rect(topleft=(0, 0)))
-
-            pygame.display.flip()
-            clock.tick(60)
-
-        board = Board(width=9, height=9, screen=screen, difficulty="easy", sudoku_board=original_board)
-
-        for row in range(len(original_board)):
-            for col in range(len(original_board[row])):
-                board.grid[row][col].set_cell_value(original_board[row][col])
-
-        restart_button = pygame.Rect(50*scale, 740*scale, 180*scale, 40*scale)
-        reset_button = pygame.Rect(270*scale, 740*scale, 180*scale, 40*scale)
-        exit_button = pygame.Rect(490*scale, 740*scale, 180*scale, 40*scale)
-
-        running = True
-
-        while running:
-            for event in pygame.event.get():
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    if restart_button.collidepoint(event.pos):
-                        print("restart button")
-                        start_screen = True
-                        break
-                    elif reset_button.collidepoint(event.pos):
-                        board.reset_to_original(original_board)
-                        print("reset button")
-                    elif exit_button.collidepoint(event.pos):
-                        running = False
-                        print("exit button")
-
-                    cellPosition = board.click(event.pos[0], event.pos[1])
-                    # if cellPosition is not None:
-                    #     # print(f'clicked in cell: {cellPosition}, value: {board.grid[cellPosition[0]][cellPosition[1]].value}')
-                    #     # print(original_board)
-
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_BACKSPACE:
-                        board.place_number(0)
-                    if event.key in range(pygame.K_1, pygame.K_9 + 1):
-                        num = event.key - pygame.K_0
-                        if board.selected_cell:
-                            board.place_number(num)
-
-                if event.type == pygame.QUIT:
-                    running = False
-
-            screen.fill((237, 245, 255))
-            s = pygame.image.load("sam pixel classroom scaled.png")
-            s.set_alpha(60)
-            screen.blit(s,s.get_rect(topleft=(0, 0)))
-            board.draw()
-
-            pygame.draw.rect(screen, "black", restart_button)
-            pygame.draw.rect(screen, "black", reset_button)
-            pygame.draw.rect(screen, "black", exit_button)
-
-            button_font = pygame.font.Font(None, 40)
-
-            restart_text = button_font.render("Restart", 0, "white")
-            reset_text = button_font.render("Reset", 0, "white")
-            exit_text = button_font.render("Exit", 0, "white")
-
-            restart_rect = restart_text.get_rect(center=restart_button.center)
-            reset_rect = reset_text.get_rect(center=reset_button.center)
-            exit_rect = exit_text.get_rect(center=exit_button.center)
-
-            screen.blit(restart_text, restart_rect)
-            screen.blit(reset_text, reset_rect)
-            screen.blit(exit_text, exit_rect)
-
-            if board.is_full():
-                if board.check_board():
-                    font = pygame.font.Font(None, 80)
-                    win_text = font.render("Game Won!", True, "black")
-                    win_rect = win_text.get_rect(center=(screen_width // 2, screen_height // 3))
-                    screen.fill("light blue")
-                    screen.blit(win_text, win_rect)
-
-                    exit_button = pygame.Rect(screen_width // 3, screen_height // 1.5, 200 * scale, 50 * scale)
-                    pygame.draw.rect(screen, "black", exit_button)
-                    button_font = pygame.font.Font(None, 40)
-                    exit_text = button_font.render("Exit", 0, "white")
-                    exit_rect = exit_text.get_rect(center=exit_button.center)
-                    screen.blit(exit_text, exit_rect)
-                else:
-                    font = pygame.font.Font(None, 80)
-                    over_text = font.render("Game Over :(", True, "black")
-                    over_rect = over_text.get_rect(center=(screen_width // 2, screen_height // 3))
-                    screen.fill("light blue")
-                    screen.blit(over_text, over_rect)
-
-                    restart_button = pygame.Rect(screen_width // 3, screen_height // 1.5, 200 * scale, 50 * scale)
-                    pygame.draw.rect(screen, "black", restart_button)
-                    button_font = pygame.font.Font(None, 40)
-                    restart_text = button_font.render("Restart", 0, "white")
-                    restart_rect = restart_text.get_rect(center=restart_button.center)
-                    screen.blit(restart_text, restart_rect)
-
-            pygame.display.flip()
-            clock.tick(60)
-
-            if start_screen:
-                main()
-
-    finally:
-        pygame.quit()
-
-
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+'''
+Helper to check uniqueness, excluding zeros (empty cells)
+
+Parameters:
+values is a list of ints from one row, column or box
+
+Return: boolean
+'''
+
+
+def is_unique(values):
+    numbers = [value for value in values if value != 0]
+    return len(numbers) == len(set(numbers))
+
+
+'''
+Checks if a board satisfies the Sudoku rules:
+- Each row contains unique values.
+- Each column contains unique values.
+- Each box contains unique values.
+Empty (0) cells are ignored, so a board with holes passes as long as nothing clashes.
+
+Parameters:
+board is a 2D list of ints or a CompactBoard
+
+Return: boolean
+'''
+
+
+def check_board(board):
+    size = len(board)
+    box_length = math.isqrt(size)
+    for row in range(size):
+        if not is_unique([board[row][col] for col in range(size)]):
+            return False
+    for col in range(size):
+        if not is_unique([board[row][col] for row in range(size)]):
+            return False
+    for row_start in range(0, size, box_length):
+        for col_start in range(0, size, box_length):
+            box_values = [board[row][col] for row in range(row_start, row_start + box_length)
+                          for col in range(col_start, col_start + box_length)]
+            if not is_unique(box_values):
+                return False
+    return True
+
+
+# number of cells removed for each difficulty button
+DIFFICULTY_REMOVED = {"easy": 30, "medium": 40, "hard": 50}
+
+
+'''
+Picks the starting board for a difficulty level
+Draws a random puzzle from that difficulty's bank file (see puzzle_bank.py) if there is one, so starting a
+game is instant, and only falls back to generate_sudoku when no bank has been built
+
+Parameters:
+difficulty is the difficulty name ("easy", "medium" or "hard")
+removed is the number of cells to clear if the puzzle has to be generated
+
+Return: list[list] or CompactBoard
+'''
+
+
+def load_puzzle(difficulty, removed):
+    path = bank_path(difficulty)
+    if os.path.exists(path):
+        with PuzzleBank(path) as bank:
+            if len(bank):
+                return bank.random_record().puzzle
+    return generate_sudoku(9, removed)
@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch_validator import validate_batch
+from sudoku_generator import check_board, generate_sudoku
+
+
+def mutated(board, rng):
+    board = [row[:] for row in board]
+    size = len(board)
+    for _ in range(rng.randrange(3)):
+        board[rng.randrange(size)][rng.randrange(size)] = rng.randrange(size + 1)
+    return board
+
+
+@pytest.mark.parametrize("size", [4, 9, 16])
+def test_agrees_with_check_board(size):
+    rng = random.Random(size)
+    boards = []
+    for seed in range(40):
+        board = generate_sudoku(size, rng.randrange(size * size // 2), seed=seed)
+        boards.append(mutated(board, rng))
+    result = validate_batch(boards)
+    assert result.valid.tolist() == [check_board(board) for board in boards]
+    assert result.solved.tolist() == [check_board(board) and all(all(row) for row in board) for board in boards]
+    # both outcomes are exercised
+    assert result.valid.any() and not result.valid.all()
+
+
+def test_conflicts_are_located():
+    board = generate_sudoku(9, 0, seed=1)
+    board[0][0], board[0][1] = board[0][1], board[0][1]
+    result = validate_batch(board)
+    assert not result.valid[0]
+    assert result.row_conflicts[0].tolist() == [True] + [False] * 8
+    assert result.col_conflicts[0, 0] and result.box_conflicts[0, 0]
+
+
+def test_rejects_bad_shapes_and_values():
+    with pytest.raises(ValueError):
+        validate_batch(np.zeros((2, 9, 8), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        validate_batch(np.zeros((1, 6, 6), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        validate_batch(np.full((1, 4, 4), 5, dtype=np.uint8))
+    # wider dtypes are range checked before the uint8 conversion could wrap them
+    with pytest.raises(ValueError):
+        validate_batch(np.full((1, 4, 4), 256, dtype=np.int64))
+    with pytest.raises(ValueError):
+        validate_batch(np.full((1, 4, 4), -1, dtype=np.int64))
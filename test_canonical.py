@@ -0,0 +1,108 @@
+import math
+import random
+
+import pytest
+
+from canonical import SolutionCache, TooSymmetric, canonicalize, dedup_bank, from_canonical
+from dlx_solver import count_solutions
+from sudoku_generator import check_board, generate_sudoku
+
+
+def random_transform(board, rng):
+    """
+    Applies a random relabeling, band/row/stack/column permutation, transposition and rotation.
+    """""
+    size = len(board)
+    box = math.isqrt(size)
+
+    def order():
+        bands = list(range(box))
+        rng.shuffle(bands)
+        out = []
+        for band in bands:
+            inner = list(range(box))
+            rng.shuffle(inner)
+            out.extend(band * box + i for i in inner)
+        return out
+
+    labels = list(range(1, size + 1))
+    rng.shuffle(labels)
+    labels = [0] + labels
+    rows, cols = order(), order()
+    out = [[labels[board[row][col]] for col in cols] for row in rows]
+    if rng.random() < 0.5:
+        out = [list(row) for row in zip(*out)]
+    for _ in range(rng.randrange(4)):
+        out = [list(row) for row in zip(*out[::-1])]
+    return out
+
+
+@pytest.mark.parametrize("size, removed", [(4, 8), (9, 30), (9, 55), (16, 90)])
+def test_canonical_form_is_invariant(size, removed):
+    rng = random.Random(size * 1000 + removed)
+    for seed in range(4):
+        puzzle = generate_sudoku(size, removed, seed=seed)
+        canonical = canonicalize(puzzle)
+        for _ in range(3):
+            other = random_transform(puzzle, rng)
+            assert canonicalize(other).board == canonical.board
+
+
+def test_full_grid_is_invariant():
+    rng = random.Random(7)
+    grid = generate_sudoku(9, 0, seed=3)
+    canonical = canonicalize(grid)
+    assert canonicalize(random_transform(grid, rng)).board == canonical.board
+
+
+def test_from_canonical_maps_back():
+    for seed in range(5):
+        puzzle = generate_sudoku(9, 40, seed=seed)
+        canonical = canonicalize(puzzle)
+        assert from_canonical(canonical.board, canonical) == puzzle
+
+
+def test_different_puzzles_differ():
+    forms = {bytes(canonicalize(generate_sudoku(9, 40, seed=seed)).board) for seed in range(10)}
+    assert len(forms) == 10
+
+
+def test_too_symmetric_board():
+    empty = [[0] * 9 for _ in range(9)]
+    with pytest.raises(TooSymmetric):
+        canonicalize(empty)
+    cache = SolutionCache(4)
+    entry = cache.lookup(empty)
+    assert entry.solutions == 2 and check_board(entry.solution)
+    assert cache.stats()["uncached"] == 1
+
+
+def test_cache_hits_equivalent_puzzles():
+    rng = random.Random(11)
+    cache = SolutionCache(16)
+    puzzle = generate_sudoku(9, 45, unique=True, seed=1)
+    first = cache.lookup(puzzle)
+    other = random_transform(puzzle, rng)
+    second = cache.lookup(other)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert first.solutions == second.solutions == count_solutions(puzzle, 2) == 1
+    for board, entry in ((puzzle, first), (other, second)):
+        assert check_board(entry.solution)
+        assert all(board[r][c] in (0, entry.solution[r][c]) for r in range(9) for c in range(9))
+
+
+def test_dedup_bank(tmp_path):
+    from puzzle_bank import PuzzleBank, PuzzleBankWriter
+
+    source = str(tmp_path / "source.bank")
+    puzzles = [generate_sudoku(9, 40, seed=seed, solution=True) for seed in range(3)]
+    with PuzzleBankWriter(source) as writer:
+        for puzzle, solution in puzzles:
+            writer.append(puzzle, solution, 0, 0)
+        # an equivalent copy of the first puzzle, with its solution moved by the same transform
+        puzzle, solution = (random_transform(board, random.Random(5)) for board in puzzles[0])
+        assert check_board(solution) and all(puzzle[r][c] in (0, solution[r][c]) for r in range(9) for c in range(9))
+        writer.append(puzzle, solution, 0, 0)
+    assert dedup_bank(source, str(tmp_path / "dest.bank")) == (3, 1)
+    with PuzzleBank(str(tmp_path / "dest.bank")) as bank:
+        assert len(bank) == 3
@@ -0,0 +1,65 @@
+import pytest
+
+from dlx_solver import count_solutions, solve
+from sudoku_generator import check_board, generate_sudoku
+
+# a well-known hard puzzle with exactly one solution
+HARD = [
+    [8, 0, 0, 0, 0, 0, 0, 0, 0],
+    [0, 0, 3, 6, 0, 0, 0, 0, 0],
+    [0, 7, 0, 0, 9, 0, 2, 0, 0],
+    [0, 5, 0, 0, 0, 7, 0, 0, 0],
+    [0, 0, 0, 0, 4, 5, 7, 0, 0],
+    [0, 0, 0, 1, 0, 0, 0, 3, 0],
+    [0, 0, 1, 0, 0, 0, 0, 6, 8],
+    [0, 0, 8, 5, 0, 0, 0, 1, 0],
+    [0, 9, 0, 0, 0, 0, 4, 0, 0],
+]
+
+
+def is_solution_of(solution, puzzle):
+    size = len(puzzle)
+    return (check_board(solution) and all(all(row) for row in solution)
+            and all(puzzle[r][c] in (0, solution[r][c]) for r in range(size) for c in range(size)))
+
+
+def test_solves_hard_puzzle():
+    solution = solve(HARD)
+    assert is_solution_of(solution, HARD)
+    assert count_solutions(HARD, 2) == 1
+
+
+@pytest.mark.parametrize("size, removed", [(4, 10), (9, 50), (16, 120)])
+def test_solves_generated_puzzles(size, removed):
+    for seed in range(5):
+        puzzle = generate_sudoku(size, removed, seed=seed)
+        assert is_solution_of(solve(puzzle), puzzle)
+
+
+def test_unique_puzzles_have_one_solution():
+    for seed in range(5):
+        assert count_solutions(generate_sudoku(9, 45, unique=True, seed=seed), 2) == 1
+
+
+def test_unsolvable_board():
+    # row 0 needs a 9 in its last cell, but column 8 already has one
+    board = [[0] * 9 for _ in range(9)]
+    board[0][:8] = [1, 2, 3, 4, 5, 6, 7, 8]
+    board[5][8] = 9
+    assert check_board(board)
+    assert solve(board) is None
+    assert count_solutions(board, 2) == 0
+
+
+def test_count_stops_at_limit():
+    empty = [[0] * 4 for _ in range(4)]
+    assert count_solutions(empty, 2) == 2
+    # a 4x4 grid has 288 solutions
+    assert count_solutions(empty, 1000) == 288
+
+
+def test_does_not_modify_board():
+    puzzle = [row[:] for row in HARD]
+    solve(puzzle)
+    count_solutions(puzzle, 2)
+    assert puzzle == HARD
@@ -0,0 +1,70 @@
+import pytest
+
+from grader import TECHNIQUES, TIER, WEIGHTS, CandidateState, Contradiction, grade, next_hint
+from sudoku_generator import generate_sudoku
+
+
+def generated(count, removed, size=9):
+    for seed in range(count):
+        yield generate_sudoku(size, removed, unique=True, seed=seed, solution=True)
+
+
+def test_eliminations_never_remove_the_true_value():
+    for puzzle, solution in generated(15, 60):
+        size = len(puzzle)
+        state = CandidateState(puzzle)
+        while state.empty:
+            for name, technique in TECHNIQUES:
+                if technique(state):
+                    break
+            else:
+                break
+            for cell in range(size * size):
+                row, col = divmod(cell, size)
+                value = solution[row][col]
+                if state.values[cell]:
+                    assert state.values[cell] == value, name
+                else:
+                    assert state.candidates[cell] >> value & 1, name
+
+
+def test_easy_puzzles_need_no_guessing():
+    for puzzle, _ in generated(10, 40):
+        result = grade(puzzle)
+        assert result.solved
+        assert "guess" not in result.counts
+
+
+def test_score_follows_the_hardest_technique():
+    for puzzle, _ in generated(15, 60):
+        result = grade(puzzle)
+        hardest = max(WEIGHTS[name] for name in result.techniques)
+        assert TIER * hardest <= result.score < TIER * (hardest + 1)
+
+
+def test_contradictory_board_needs_guessing():
+    board = [[0] * 9 for _ in range(9)]
+    board[0][:8] = [1, 2, 3, 4, 5, 6, 7, 8]
+    board[5][8] = 9
+    result = grade(board)
+    assert not result.solved
+    assert "guess" in result.techniques
+
+
+def test_place_rejects_a_clash():
+    board = [[0] * 4 for _ in range(4)]
+    board[0][0] = 1
+    state = CandidateState(board)
+    with pytest.raises(Contradiction):
+        state.place(1, 1)
+
+
+def test_hint_places_the_true_value():
+    for puzzle, solution in generated(10, 50):
+        hint = next_hint(puzzle)
+        assert hint is not None
+        assert puzzle[hint.row][hint.col] == 0
+        assert hint.value == solution[hint.row][hint.col]
+        # seeding from known candidate masks gives the same hint
+        state = CandidateState(puzzle)
+        assert next_hint(puzzle, state.candidates) == hint
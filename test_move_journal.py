@@ -0,0 +1,124 @@
+import pytest
+
+from move_journal import MoveJournal, load_game, pack_delta, save_game, unpack_delta
+from sudoku_generator import generate_sudoku
+
+pytest.importorskip("pygame")
+from sudoku import Board  # noqa: E402
+
+
+def make_board(seed=1, size=9, removed=40):
+    puzzle = generate_sudoku(size, removed, seed=seed)
+    return puzzle, Board(size, size, None, "medium", puzzle)
+
+
+def play(board, moves):
+    for row, col, value, sketch in moves:
+        board.select(row, col)
+        if sketch:
+            board.sketch(value)
+        else:
+            board.place_number(value)
+
+
+def empty_cells(puzzle):
+    return [(row, col) for row, col in ((r, c) for r in range(len(puzzle)) for c in range(len(puzzle)))
+            if puzzle[row][col] == 0]
+
+
+def snapshot(board):
+    return [[(cell.value, cell.sketched_value) for cell in row] for row in board.grid]
+
+
+def test_delta_round_trip():
+    for fields in [(0, 0, 0, 0, 0), (624, 25, 1, 31, 7), (80, 9, 0, 3, 0)]:
+        assert unpack_delta(pack_delta(*fields)) == fields
+
+
+def test_record_after_undo_drops_redo_steps():
+    journal = MoveJournal()
+    journal.record([1])
+    journal.record([2, 3])
+    assert list(journal.undo()) == [2, 3]
+    journal.record([4])
+    assert not journal.can_redo()
+    assert len(journal) == 2
+    assert list(journal.undo()) == [4]
+    assert list(journal.undo()) == [1]
+    assert journal.undo() is None
+
+
+def test_undo_redo_goto():
+    puzzle, board = make_board()
+    cells = empty_cells(puzzle)[:6]
+    states = [snapshot(board)]
+    for index, (row, col) in enumerate(cells):
+        play(board, [(row, col, index % 9 + 1, index % 2)])
+        states.append(snapshot(board))
+
+    for position in range(len(cells), 0, -1):
+        assert board.undo()
+        assert snapshot(board) == states[position - 1]
+    assert not board.undo()
+    for position in range(1, len(cells) + 1):
+        assert board.redo()
+        assert snapshot(board) == states[position]
+    assert not board.redo()
+
+    for position in (3, 0, len(cells), 2):
+        board.goto(position)
+        assert snapshot(board) == states[position]
+
+
+def test_undo_keeps_counts_and_conflicts_in_step():
+    puzzle, board = make_board(seed=2)
+    fresh = Board(9, 9, None, "medium", puzzle)
+    row, col = empty_cells(puzzle)[0]
+    clash = next(value for value in puzzle[row] if value)
+    play(board, [(row, col, clash, 0)])
+    assert board.conflicts
+    board.undo()
+    assert board.conflicts == fresh.conflicts
+    assert board.filled == fresh.filled
+    assert board.candidates == fresh.candidates
+
+
+def test_reset_is_one_undoable_step():
+    puzzle, board = make_board(seed=3)
+    play(board, [(row, col, 1, 0) for row, col in empty_cells(puzzle)[:4]])
+    before = snapshot(board)
+    board.reset_to_original(puzzle)
+    assert [[value for value, _ in row] for row in snapshot(board)] == puzzle
+    board.undo()
+    assert snapshot(board) == before
+
+
+@pytest.mark.parametrize("size, removed", [(9, 40), (16, 100)])
+def test_save_restore_round_trip(size, removed):
+    puzzle, board = make_board(seed=4, size=size, removed=removed)
+    cells = empty_cells(puzzle)
+    play(board, [(row, col, index % size + 1, index % 3 == 0) for index, (row, col) in enumerate(cells[:8])])
+    board.undo()
+    board.undo()
+
+    restored = Board.restore(board.save(), None)
+    assert snapshot(restored) == snapshot(board)
+    assert restored.difficulty == board.difficulty
+    assert restored.journal.position == board.journal.position
+    assert list(restored.journal.deltas) == list(board.journal.deltas)
+    # the undone steps survive the round trip and can still be redone
+    assert restored.redo() and board.redo()
+    assert snapshot(restored) == snapshot(board)
+
+
+def test_load_game_rejects_bad_data():
+    puzzle = generate_sudoku(9, 40, seed=5)
+    journal = MoveJournal()
+    journal.record([pack_delta(0, 0, 1, 0, 0)])
+    data = save_game(puzzle, journal, "easy")
+    givens, loaded, difficulty = load_game(data)
+    assert givens.to_rows() == puzzle and difficulty == "easy" and list(loaded.deltas) == list(journal.deltas)
+    with pytest.raises(ValueError):
+        load_game(data[:-1])
+    with pytest.raises(ValueError):
+        load_game(b"XXXX" + data[4:])
@@ -0,0 +1,77 @@
+"""
+Shared cache for text rendering.
+
+pygame.font.Font objects are expensive to build and the game only ever draws a handful of strings
+(digits 1-9 and the button labels), so every font is built once per size and every rendered string is
+kept as a surface keyed by (text, color, size, antialias). Drawing code then only blits.
+
+pygame.init() (or pygame.font.init()) must be called before anything here is used.
+
+"""
+
+import pygame
+
+_fonts = {}
+_surfaces = {}
+
+
+'''
+Returns the default pygame font at the given size, building it only the first time
+
+Parameters:
+size is the font size in pixels
+
+Return: pygame.font.Font
+'''
+
+
+def get_font(size):
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+'''
+Returns a rendered surface for text, rendering it only the first time it is asked for
+
+Parameters:
+text is the string (or digit) to render
+color is any pygame color value that can be used as a dict key, e.g. "white" or (54, 54, 54)
+size is the font size in pixels
+antialias is passed to Font.render (default True)
+
+Return: pygame.Surface
+'''
+
+
+def render_text(text, color, size, antialias=True):
+    key = (text, color, size, antialias)
+    surface = _surfaces.get(key)
+    if surface is None:
+        surface = _surfaces[key] = get_font(size).render(str(text), antialias, color)
+    return surface
+
+
+'''
+Renders the digits 1 to max_digit in every given color ahead of time, so the first frame of a game
+does not pay for them
+
+Parameters:
+colors is an iterable of pygame color values
+size is the font size in pixels
+max_digit is the largest digit to render (default 9)
+
+Return: None
+'''
+
+
+def preload_digits(colors, size, max_digit=9):
+    for color in colors:
+        for digit in range(1, max_digit + 1):
+            render_text(digit, color, size)
+
+
+def clear():
+    _fonts.clear()
+    _surfaces.clear()